@@ -6,7 +6,11 @@ from homeassistant.helpers.typing import ConfigType
 from homeassistant.const import Platform
 import logging
 
-from .const import DOMAIN
+from .const import DOMAIN, CONF_ENERGY_METER, DEFAULT_ENERGY_METER
+from .tariffs import tariff_config_from_options
+from .history import PriceHistory
+from .services import async_register_services
+from .websocket_api import async_register_websocket_api
 
 _LOGGER = logging.getLogger(__name__)
 PLATFORMS: list[Platform] = [Platform.SENSOR]
@@ -15,11 +19,18 @@ async def async_setup(hass: HomeAssistant, config: ConfigType):
     """Set up this integration using YAML is not supported."""
     if DOMAIN not in hass.data:
         hass.data.setdefault(DOMAIN, {})
+    async_register_websocket_api(hass)
+    async_register_services(hass)
     return True
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up rce_pse-tommyleesue integration."""
     _LOGGER.info("rce_pse-tommyleesue-async_setup_entry " + str(entry))
+
+    # Lokalna historia cen (prognoza, eksport, analizy)
+    history = PriceHistory(hass)
+    await history.async_load()
+    hass.data.setdefault(DOMAIN, {})["history"] = history
     
     # Dodaj listener do aktualizacji opcji
     entry.async_on_unload(entry.add_update_listener(async_update_options))
@@ -28,9 +39,21 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return True
 
 async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Handle options update - reload the integration."""
-    _LOGGER.info("Options updated, reloading integration")
-    await hass.config_entries.async_reload(entry.entry_id)
+    """Handle options update - apply in place without reloading."""
+    sensor = hass.data.get(DOMAIN, {}).get("sensor")
+    # Zmiana licznika energii lub włączenie / wyłączenie taryfy dodaje
+    # lub usuwa encje - wymaga przeładowania
+    if (
+        sensor is None
+        or sensor.energy_meter != entry.options.get(CONF_ENERGY_METER, DEFAULT_ENERGY_METER)
+        or sensor.curves_enabled != (tariff_config_from_options(entry.options) is not None)
+    ):
+        _LOGGER.info("Options updated, reloading integration")
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+
+    _LOGGER.info("Options updated, applying without reload")
+    await sensor.async_apply_options(entry.options)
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload config entry."""
@@ -46,6 +69,8 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     if unload_ok:
         # Możesz wyczyścić dane jeśli chcesz
         # hass.data.pop(DOMAIN, None)
+        hass.data.get(DOMAIN, {}).pop("history", None)
+        hass.data.get(DOMAIN, {}).pop("sensor", None)
         _LOGGER.info("rce_pse-tommyleesue unloaded successfully")
         return True
 
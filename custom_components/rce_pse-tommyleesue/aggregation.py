@@ -0,0 +1,208 @@
+"""Agregacja cen 15-minutowych do godzin 1-24 dla rce_pse-tommyleesue."""
+from __future__ import annotations
+
+from datetime import date, datetime, time, timezone
+from functools import lru_cache
+import logging
+import math
+from zoneinfo import ZoneInfo
+
+from .const import (
+    AGGREGATION_INTERVAL_START,
+    AGGREGATION_MIN,
+    AGGREGATION_MAX,
+    AGGREGATION_WEIGHTED,
+    DEFAULT_QUARTER_WEIGHTS,
+    PSE_TIME_ZONE,
+    QUARTERS_PER_HOUR,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+SLOTS_PER_DAY = 24 * QUARTERS_PER_HOUR
+
+
+def parse_hour_minute(dtime: str):
+    """
+    Zwróć (godzina, minuta) z pola dtime bez pełnego parsowania daty.
+
+    Obsługuje "YYYY-MM-DD HH:MM:SS" oraz "YYYY-MM-DDTHH:MM:SSZ"; inne formaty
+    przechodzą przez datetime.fromisoformat.
+    """
+    if len(dtime) >= 16 and dtime[13] == ":":
+        return int(dtime[11:13]), int(dtime[14:16])
+    dt = datetime.fromisoformat(dtime.replace('Z', '+00:00'))
+    return dt.hour, dt.minute
+
+
+@lru_cache(maxsize=32)
+def expected_hours(day_date: date) -> frozenset:
+    """
+    Zwróć godziny 1-24 istniejące w danej dobie czasu polskiego.
+
+    W dniu zmiany czasu na letni godzina 02:00-03:00 nie istnieje i nie jest
+    traktowana jako brakująca.
+    """
+    tz = ZoneInfo(PSE_TIME_ZONE)
+    hours = set()
+    for hour in range(1, 25):
+        local = datetime.combine(day_date, time(hour - 1, 30), tz)
+        roundtrip = local.astimezone(timezone.utc).astimezone(tz)
+        if roundtrip.replace(tzinfo=None) == local.replace(tzinfo=None):
+            hours.add(hour)
+    return frozenset(hours)
+
+
+def hour_complete(present: int, hour: int, day_hours) -> bool:
+    """Godzina jest kompletna, jeśli ma 4 kwadranse lub nie istnieje w dobie."""
+    return present >= QUARTERS_PER_HOUR if present else hour not in day_hours
+
+
+def alignment_offset(aggregation: str) -> int:
+    """
+    Przesunięcie kwadransów względem początku godziny.
+
+    1 = dtime oznacza koniec interwału (godzina X = X:15, X:30, X:45, X+1:00),
+    0 = dtime oznacza początek interwału (godzina X = X:00 ... X:45).
+    """
+    return 0 if aggregation == AGGREGATION_INTERVAL_START else 1
+
+
+def valid_quarter_weights(weights) -> bool:
+    """Sprawdź wagi kwadransów: 4 skończone, nieujemne liczby o dodatniej sumie."""
+    return (
+        len(weights) == QUARTERS_PER_HOUR
+        and all(math.isfinite(w) and w >= 0 for w in weights)
+        and sum(weights) > 0
+    )
+
+
+def quarter_weights_from_option(value) -> tuple:
+    """Zamień opcję "w1,w2,w3,w4" na krotkę wag kwadransów (domyślnie równe)."""
+    try:
+        weights = tuple(float(part) for part in str(value).split(","))
+    except ValueError:
+        weights = ()
+    if not valid_quarter_weights(weights):
+        return tuple(float(part) for part in DEFAULT_QUARTER_WEIGHTS.split(","))
+    return weights
+
+
+def bucket_quarters(values, offset: int, day_date: date) -> list:
+    """
+    Jednym przebiegiem rozłóż punkty API do tablicy 96 slotów (godziny po kolei).
+
+    Tablice sum i liczników są alokowane z góry; zdublowane kwadranse
+    (zmiana czasu na zimowy) są uśredniane. Punkt z datą następnej doby
+    (dtime 00:00) jest ostatnim kwadransem dnia przy offset=1, a przy
+    offset=0 należy już do następnego dnia i jest pomijany - tak jak
+    wszystkie punkty wypadające poza sloty 0-95. Zwraca listę cen lub None.
+    """
+    sums = [0.0] * SLOTS_PER_DAY
+    counts = [0] * SLOTS_PER_DAY
+    day_str = day_date.isoformat()
+
+    for item in values:
+        try:
+            hour_0_23, minute = parse_hour_minute(item["dtime"])
+            price = float(item["rce_pln"])
+        except (KeyError, ValueError, TypeError, AttributeError) as e:
+            _LOGGER.warning("Nieprawidłowy element danych: %s, błąd: %s", item, e)
+            continue
+
+        if minute % 15 or not 0 <= hour_0_23 < 24:
+            continue
+
+        slot = hour_0_23 * QUARTERS_PER_HOUR + minute // 15 - offset
+        if item["dtime"][:10] > day_str:
+            slot += SLOTS_PER_DAY
+        if not 0 <= slot < SLOTS_PER_DAY:
+            continue
+        sums[slot] += price
+        counts[slot] += 1
+
+    return [
+        total / count if count else None
+        for total, count in zip(sums, counts)
+    ]
+
+
+def day_from_values(values, day_date: date, aggregation: str, weights: tuple) -> list:
+    """Zagreguj punkty API jednej business_date do 24 godzin (bez rankingu)."""
+    return build_day(
+        bucket_quarters(values, alignment_offset(aggregation), day_date),
+        expected_hours(day_date),
+        aggregation,
+        weights,
+    )
+
+
+def flatten_day(day) -> list:
+    """Odtwórz tablicę 96 slotów z kwadransów zapisanych w godzinach dnia."""
+    slots = []
+    for item in day:
+        quarters = list(item.get("quarters") or ())
+        slots.extend((quarters + [None] * QUARTERS_PER_HOUR)[:QUARTERS_PER_HOUR])
+    return slots
+
+
+def realign(slots: list, from_offset: int, to_offset: int) -> list:
+    """
+    Przesuń tablicę slotów między wyrównaniem do końca i początku interwału.
+
+    Kwadrans wysunięty poza dobę jest odrzucany, a zwolniony slot ma
+    wartość None (godzina staje się niekompletna, jak przy bucket_quarters).
+    """
+    shift = from_offset - to_offset
+    if shift > 0:
+        return [None] * shift + slots[:-shift]
+    if shift < 0:
+        return slots[-shift:] + [None] * -shift
+    return slots
+
+
+def _aggregate(present: list, quarters: list, aggregation: str, weights: tuple):
+    """Policz cenę godziny wybraną metodą."""
+    if aggregation == AGGREGATION_MIN:
+        return min(present)
+    if aggregation == AGGREGATION_MAX:
+        return max(present)
+    if aggregation == AGGREGATION_WEIGHTED:
+        pairs = [(w, p) for w, p in zip(weights, quarters) if p is not None]
+        total_weight = sum(w for w, _ in pairs)
+        if total_weight:
+            return sum(w * p for w, p in pairs) / total_weight
+    return sum(present) / len(present)
+
+
+def build_day(slots: list, day_hours, aggregation: str, weights: tuple) -> list:
+    """
+    Zbuduj kompletny dzień z 24 godzinami (1-24) z tablicy 96 slotów.
+
+    Godzina jest kompletna, jeśli ma 4 kwadranse lub nie istnieje w danej
+    dobie (zmiana czasu).
+    """
+    day = []
+    for hour in range(1, 25):
+        start = (hour - 1) * QUARTERS_PER_HOUR
+        quarters = slots[start:start + QUARTERS_PER_HOUR]
+        present = [price for price in quarters if price is not None]
+
+        day.append({
+            "hour": hour,
+            "start": f"{hour-1:02d}:00",
+            "tariff": (
+                round(_aggregate(present, quarters, aggregation, weights), 2)
+                if present
+                else None
+            ),
+            "quarters_count": len(present),
+            "quarters": quarters,
+            "complete": hour_complete(len(present), hour, day_hours),
+        })
+
+    _LOGGER.debug(
+        "Liczba kwadransów w godzinach: %s",
+        {item["hour"]: item["quarters_count"] for item in day if item["quarters_count"]},
+    )
+    return day
@@ -0,0 +1,122 @@
+"""Symulacja strategii tanich / drogich godzin na historii cen rce_pse-tommyleesue."""
+from __future__ import annotations
+
+from datetime import date
+
+from .const import BACKTEST_MODE_HALVES
+from .history import day_from_entry
+from .ranking import PriceRanking
+
+# Grupy godzin (indeksy 0-23), w obrębie których przesuwane jest zużycie
+_WHOLE_DAY = (range(24),)
+_HALVES = (range(12), range(12, 24))
+
+
+def _day_groups(day, mode: str, avoid_hours: frozenset):
+    """
+    Zwróć listę (tanie, drogie) indeksów godzin dla każdej grupy dnia.
+
+    mode "day" używa flag l_price / h_price, "halves" flag am_* / pm_*
+    (zużycie przesuwane w obrębie tej samej połowy doby). Godziny z
+    avoid_hours (1-24) są traktowane jak drogie.
+    """
+    if mode == BACKTEST_MODE_HALVES:
+        groups = _HALVES
+        flags = (("am_l_price", "am_h_price"), ("pm_l_price", "pm_h_price"))
+    else:
+        groups = _WHOLE_DAY
+        flags = (("l_price", "h_price"),)
+
+    result = []
+    for hours, (cheap_flag, expensive_flag) in zip(groups, flags):
+        cheap = [i for i in hours if day[i].get(cheap_flag)]
+        expensive = [
+            i for i in hours
+            if day[i]["tariff"] is not None
+            and i not in cheap
+            and (day[i].get(expensive_flag) or i + 1 in avoid_hours)
+        ]
+        result.append((cheap, expensive))
+    return result
+
+
+def run_backtest(
+    ranking: PriceRanking,
+    entries: list[tuple[date, dict]],
+    load_profile: list[float],
+    mode: str,
+    shift_share: float,
+    avoid_hours: frozenset = frozenset(),
+) -> dict:
+    """
+    Przelicz strategię na dniach historii (jedno zadanie executora).
+
+    Dla każdego dnia ranking liczy `ranking` (PriceRanking z parametrami
+    strategii). Udział `shift_share` zużycia z drogich godzin
+    jest przenoszony równo na tanie godziny tej samej grupy. Porównanie:
+    - flat: to samo zużycie po średniej cenie dnia (bazowa cena stała),
+    - dynamic: zużycie bez przesunięć po cenach godzinowych,
+    - strategy: zużycie po przesunięciu.
+    Koszty w PLN przy cenach RCE (PLN/MWh) i zużyciu w kWh.
+    """
+    flat_cost = 0.0
+    dynamic_cost = 0.0
+    strategy_cost = 0.0
+    energy = 0.0
+    shifted_energy = 0.0
+    days_used = 0
+    daily = []
+
+    for day_date, entry in entries:
+        day = day_from_entry(day_date, entry)
+        ranking.rank(day)
+
+        prices = [item["tariff"] for item in day]
+        valid = [i for i, price in enumerate(prices) if price is not None]
+        if not valid:
+            continue
+
+        load = [load_profile[i] if prices[i] is not None else 0.0 for i in range(24)]
+        shifted = list(load)
+        for cheap, expensive in _day_groups(day, mode, avoid_hours):
+            if not cheap or not expensive:
+                continue
+            moved = 0.0
+            for i in expensive:
+                amount = shifted[i] * shift_share
+                shifted[i] -= amount
+                moved += amount
+            for i in cheap:
+                shifted[i] += moved / len(cheap)
+            shifted_energy += moved
+
+        day_energy = sum(load)
+        average = sum(prices[i] for i in valid) / len(valid)
+        day_flat = day_energy * average / 1000
+        day_dynamic = sum(load[i] * prices[i] for i in valid) / 1000
+        day_strategy = sum(shifted[i] * prices[i] for i in valid) / 1000
+
+        flat_cost += day_flat
+        dynamic_cost += day_dynamic
+        strategy_cost += day_strategy
+        energy += day_energy
+        days_used += 1
+        daily.append({
+            "date": day_date.isoformat(),
+            "flat_cost": round(day_flat, 2),
+            "dynamic_cost": round(day_dynamic, 2),
+            "strategy_cost": round(day_strategy, 2),
+        })
+
+    return {
+        "days": days_used,
+        "energy": round(energy, 3),
+        "shifted_energy": round(shifted_energy, 3),
+        "flat_cost": round(flat_cost, 2),
+        "dynamic_cost": round(dynamic_cost, 2),
+        "strategy_cost": round(strategy_cost, 2),
+        "savings_vs_flat": round(flat_cost - strategy_cost, 2),
+        "savings_vs_dynamic": round(dynamic_cost - strategy_cost, 2),
+        "average_price_paid": round(strategy_cost * 1000 / energy, 2) if energy else None,
+        "daily": daily,
+    }
@@ -0,0 +1,144 @@
+"""Współdzielony cache odpowiedzi API PSE dla wielu instancji Home Assistant."""
+from __future__ import annotations
+
+from datetime import date, datetime
+import fcntl
+import logging
+import os
+from pathlib import Path
+import tempfile
+import time
+
+from .const import SHARED_CACHE_MAX_AGE, SHARED_CACHE_RETENTION
+
+_LOGGER = logging.getLogger(__name__)
+
+# Odpowiedź z co najmniej jednym punktem cenowym zawiera to pole
+_DATA_MARKER = b'"rce_pln"'
+
+# Wpisy muszą być czytelne dla instancji działających jako inni użytkownicy
+_FILE_MODE = 0o644
+
+# Pliki tymczasowe starsze niż to (sekundy) są pozostałością po awarii zapisu
+_TMP_MAX_AGE = 3600
+
+
+class SharedDayCache:
+    """
+    Katalogowy cache surowych odpowiedzi API dla business_date.
+
+    Pierwsza instancja, która pobierze dzień, zapisuje go atomowo (plik
+    tymczasowy + os.replace), pozostałe czytają plik. Blokada fcntl na
+    pliku .lock danego dnia sprawia, że na hoście wykonywane jest jedno
+    zapytanie do API zamiast N. Wszystkie metody są blokujące i muszą być
+    wywoływane w executorze.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """Inicjalizacja cache."""
+        self._dir = Path(directory)
+        self._unavailable_logged = False
+
+    def fetch(self, day_str: str, fetch_func):
+        """
+        Zwróć dane dnia z cache lub pobierz je przez fetch_func i opublikuj.
+
+        Gdy katalogu lub blokady nie da się użyć (brak praw, system plików
+        tylko do odczytu), dane są pobierane bezpośrednio - awaria cache
+        nie może zatrzymać aktualizacji sensora.
+        """
+        try:
+            self._dir.mkdir(parents=True, exist_ok=True)
+            fd = self._lock(day_str)
+        except OSError as e:
+            # Jedno ostrzeżenie na instancję, kolejne pobrania tylko w debug
+            log = _LOGGER.debug if self._unavailable_logged else _LOGGER.warning
+            log("Współdzielony cache niedostępny (%s), pobieranie bez cache: %s", self._dir, e)
+            self._unavailable_logged = True
+            return fetch_func(day_str)
+
+        try:
+            content = self._read(day_str)
+            if content is not None:
+                _LOGGER.debug("Dane dla %s z współdzielonego cache", day_str)
+                return content
+
+            content = fetch_func(day_str)
+            if content is not None and _DATA_MARKER in content:
+                self._write(day_str, content)
+            return content
+        finally:
+            self._unlock(fd)
+
+    def _path(self, day_str: str) -> Path:
+        return self._dir / f"rce-{day_str}.json"
+
+    def _lock(self, day_str: str) -> int:
+        """Załóż wyłączną blokadę międzyprocesową dla jednego dnia (zwraca fd)."""
+        # Tylko do odczytu - flock nie wymaga zapisu, a plik blokady mógł
+        # utworzyć inny użytkownik
+        fd = os.open(self._dir / f"rce-{day_str}.lock", os.O_RDONLY | os.O_CREAT, _FILE_MODE)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        except OSError:
+            os.close(fd)
+            raise
+        return fd
+
+    @staticmethod
+    def _unlock(fd: int) -> None:
+        """Zwolnij blokadę dnia."""
+        try:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def _read(self, day_str: str):
+        """Odczytaj wpis, jeśli jest aktualny (dni przeszłe nie wygasają)."""
+        path = self._path(day_str)
+        try:
+            age = time.time() - path.stat().st_mtime
+            if date.fromisoformat(day_str) >= datetime.now().date() and (
+                age > SHARED_CACHE_MAX_AGE.total_seconds()
+            ):
+                return None
+            return path.read_bytes()
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, day_str: str, content: bytes) -> None:
+        """Zapisz wpis atomowo i usuń przeterminowane pliki."""
+        tmp_name = None
+        try:
+            with tempfile.NamedTemporaryFile(
+                dir=self._dir, prefix=".rce-", delete=False
+            ) as tmp:
+                tmp_name = tmp.name
+                tmp.write(content)
+                tmp.flush()
+                os.fsync(tmp.fileno())
+            # NamedTemporaryFile tworzy plik 0600 - os.replace zachowuje te prawa
+            os.chmod(tmp_name, _FILE_MODE)
+            os.replace(tmp_name, self._path(day_str))
+        except OSError as e:
+            _LOGGER.warning("Nie można zapisać współdzielonego cache dla %s: %s", day_str, e)
+            if tmp_name is not None:
+                try:
+                    os.unlink(tmp_name)
+                except OSError:
+                    pass
+            return
+
+        now = time.time()
+        for pattern, max_age in (
+            ("rce-*", SHARED_CACHE_RETENTION.total_seconds()),
+            (".rce-*", _TMP_MAX_AGE),
+        ):
+            for path in self._dir.glob(pattern):
+                try:
+                    if path.stat().st_mtime < now - max_age:
+                        path.unlink()
+                except OSError:
+                    continue
@@ -27,7 +27,41 @@ from .const import (
     DEFAULT_CHEAP_AM_HOURS,
     DEFAULT_EXPENSIVE_PM_HOURS,
     DEFAULT_CHEAP_PM_HOURS,
+    CONF_TARIFF,
+    CONF_DISTRIBUTION_PEAK,
+    CONF_DISTRIBUTION_OFFPEAK,
+    CONF_TRADE_MARGIN,
+    CONF_EXCISE,
+    CONF_VAT,
+    CONF_NET_BILLING_COEF,
+    DEFAULT_TARIFF,
+    DEFAULT_DISTRIBUTION_PEAK,
+    DEFAULT_DISTRIBUTION_OFFPEAK,
+    DEFAULT_TRADE_MARGIN,
+    DEFAULT_EXCISE,
+    DEFAULT_VAT,
+    DEFAULT_NET_BILLING_COEF,
+    TARIFFS,
+    TARIFF_NONE,
+    CONF_FORECAST_DAYS,
+    CONF_FORECAST_METHOD,
+    DEFAULT_FORECAST_DAYS,
+    DEFAULT_FORECAST_METHOD,
+    FORECAST_METHODS,
+    CONF_SHARED_CACHE_DIR,
+    DEFAULT_SHARED_CACHE_DIR,
+    CONF_ROLLING_HOURS,
+    DEFAULT_ROLLING_HOURS,
+    MAX_ROLLING_HOURS,
+    CONF_AGGREGATION,
+    CONF_QUARTER_WEIGHTS,
+    DEFAULT_AGGREGATION,
+    DEFAULT_QUARTER_WEIGHTS,
+    AGGREGATIONS,
+    CONF_ENERGY_METER,
+    DEFAULT_ENERGY_METER,
 )
+from .aggregation import valid_quarter_weights
 
 
 class PSESensorConfigFlow(ConfigFlow, domain=DOMAIN):
@@ -102,6 +136,48 @@ class PSESensorOptionFlow(OptionsFlow):
             cheap_pm_hours = user_input.get(CONF_CHEAP_PM_HOURS, DEFAULT_CHEAP_PM_HOURS)
             if not (1 <= cheap_pm_hours <= 12):
                 errors[CONF_CHEAP_PM_HOURS] = "invalid_hours"
+
+            # Walidacja składników ceny końcowej (PLN/kWh)
+            for key, default in (
+                (CONF_DISTRIBUTION_PEAK, DEFAULT_DISTRIBUTION_PEAK),
+                (CONF_DISTRIBUTION_OFFPEAK, DEFAULT_DISTRIBUTION_OFFPEAK),
+                (CONF_TRADE_MARGIN, DEFAULT_TRADE_MARGIN),
+                (CONF_EXCISE, DEFAULT_EXCISE),
+            ):
+                if not (0 <= user_input.get(key, default) <= 10):
+                    errors[key] = "invalid_value"
+
+            vat = user_input.get(CONF_VAT, DEFAULT_VAT)
+            if not (0 <= vat <= 100):
+                errors[CONF_VAT] = "invalid_value"
+
+            net_billing_coef = user_input.get(CONF_NET_BILLING_COEF, DEFAULT_NET_BILLING_COEF)
+            if not (0 <= net_billing_coef <= 5):
+                errors[CONF_NET_BILLING_COEF] = "invalid_value"
+
+            forecast_days = user_input.get(CONF_FORECAST_DAYS, DEFAULT_FORECAST_DAYS)
+            if not (0 <= forecast_days <= 3):  # 0 = prognoza wyłączona
+                errors[CONF_FORECAST_DAYS] = "invalid_value"
+
+            shared_cache_dir = user_input.get(CONF_SHARED_CACHE_DIR, DEFAULT_SHARED_CACHE_DIR)
+            if shared_cache_dir and not shared_cache_dir.startswith("/"):
+                errors[CONF_SHARED_CACHE_DIR] = "invalid_path"
+
+            rolling_hours = user_input.get(CONF_ROLLING_HOURS, DEFAULT_ROLLING_HOURS)
+            if not (0 <= rolling_hours <= MAX_ROLLING_HOURS):  # 0 = wyłączony
+                errors[CONF_ROLLING_HOURS] = "invalid_hours"
+
+            quarter_weights = user_input.get(CONF_QUARTER_WEIGHTS, DEFAULT_QUARTER_WEIGHTS)
+            try:
+                weights = [float(part) for part in quarter_weights.split(",")]
+                if not valid_quarter_weights(weights):
+                    errors[CONF_QUARTER_WEIGHTS] = "invalid_value"
+            except ValueError:
+                errors[CONF_QUARTER_WEIGHTS] = "invalid_value"
+
+            energy_meter = user_input.get(CONF_ENERGY_METER, DEFAULT_ENERGY_METER)
+            if energy_meter and not energy_meter.startswith("sensor."):
+                errors[CONF_ENERGY_METER] = "invalid_value"
             
             
             if not errors:
@@ -177,4 +253,110 @@ class PSESensorOptionFlow(OptionsFlow):
                 ),
                 description="Liczba tanich godzin w drugiej połowie doby (1-12)"
             ): vol.Coerce(int),
+
+            vol.Optional(
+                CONF_TARIFF,
+                default=self._config_entry.options.get(CONF_TARIFF, DEFAULT_TARIFF),
+                description="Taryfa dystrybucyjna sensorów cen końcowych (none = wyłączone, G11, G12, G12w, G12n, G13)"
+            ): vol.In([TARIFF_NONE, *TARIFFS]),
+
+            vol.Optional(
+                CONF_DISTRIBUTION_PEAK,
+                default=self._config_entry.options.get(
+                    CONF_DISTRIBUTION_PEAK, DEFAULT_DISTRIBUTION_PEAK
+                ),
+                description="Stawka dystrybucyjna w strefie szczytowej netto (PLN/kWh)"
+            ): vol.Coerce(float),
+
+            vol.Optional(
+                CONF_DISTRIBUTION_OFFPEAK,
+                default=self._config_entry.options.get(
+                    CONF_DISTRIBUTION_OFFPEAK, DEFAULT_DISTRIBUTION_OFFPEAK
+                ),
+                description="Stawka dystrybucyjna w strefie pozaszczytowej netto (PLN/kWh)"
+            ): vol.Coerce(float),
+
+            vol.Optional(
+                CONF_TRADE_MARGIN,
+                default=self._config_entry.options.get(
+                    CONF_TRADE_MARGIN, DEFAULT_TRADE_MARGIN
+                ),
+                description="Marża sprzedawcy netto (PLN/kWh)"
+            ): vol.Coerce(float),
+
+            vol.Optional(
+                CONF_EXCISE,
+                default=self._config_entry.options.get(CONF_EXCISE, DEFAULT_EXCISE),
+                description="Akcyza (PLN/kWh)"
+            ): vol.Coerce(float),
+
+            vol.Optional(
+                CONF_VAT,
+                default=self._config_entry.options.get(CONF_VAT, DEFAULT_VAT),
+                description="Stawka VAT (%)"
+            ): vol.Coerce(float),
+
+            vol.Optional(
+                CONF_NET_BILLING_COEF,
+                default=self._config_entry.options.get(
+                    CONF_NET_BILLING_COEF, DEFAULT_NET_BILLING_COEF
+                ),
+                description="Współczynnik net-billingu dla ceny sprzedaży"
+            ): vol.Coerce(float),
+
+            vol.Optional(
+                CONF_FORECAST_DAYS,
+                default=self._config_entry.options.get(
+                    CONF_FORECAST_DAYS, DEFAULT_FORECAST_DAYS
+                ),
+                description="Liczba dni prognozy po ostatnim znanym dniu (0-3, 0 = wyłączona)"
+            ): vol.Coerce(int),
+
+            vol.Optional(
+                CONF_FORECAST_METHOD,
+                default=self._config_entry.options.get(
+                    CONF_FORECAST_METHOD, DEFAULT_FORECAST_METHOD
+                ),
+                description="Metoda prognozy (seasonal_naive, weekday_profile, regression)"
+            ): vol.In(FORECAST_METHODS),
+
+            vol.Optional(
+                CONF_SHARED_CACHE_DIR,
+                default=self._config_entry.options.get(
+                    CONF_SHARED_CACHE_DIR, DEFAULT_SHARED_CACHE_DIR
+                ),
+                description="Katalog współdzielonego cache (puste = wyłączony)"
+            ): str,
+
+            vol.Optional(
+                CONF_ROLLING_HOURS,
+                default=self._config_entry.options.get(
+                    CONF_ROLLING_HOURS, DEFAULT_ROLLING_HOURS
+                ),
+                description="Długość okna rankingu kroczącego w godzinach (0-48, 0 = wyłączony)"
+            ): vol.Coerce(int),
+
+            vol.Optional(
+                CONF_AGGREGATION,
+                default=self._config_entry.options.get(
+                    CONF_AGGREGATION, DEFAULT_AGGREGATION
+                ),
+                description="Agregacja kwadransów do godzin (interval_end, interval_start, min, max, weighted)"
+            ): vol.In(AGGREGATIONS),
+
+            vol.Optional(
+                CONF_QUARTER_WEIGHTS,
+                default=self._config_entry.options.get(
+                    CONF_QUARTER_WEIGHTS, DEFAULT_QUARTER_WEIGHTS
+                ),
+                description="Wagi kwadransów dla agregacji weighted (np. 1,1,2,2)"
+            ): str,
+
+            vol.Optional(
+                CONF_ENERGY_METER,
+                default=self._config_entry.options.get(
+                    CONF_ENERGY_METER, DEFAULT_ENERGY_METER
+                ),
+                description="Encja licznika energii w kWh dla licznika kosztów (puste = wyłączony)"
+            ): str,
         })
\ No newline at end of file
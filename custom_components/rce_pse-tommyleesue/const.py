@@ -16,6 +16,109 @@ DEFAULT_CHEAP_AM_HOURS = 2
 DEFAULT_EXPENSIVE_PM_HOURS = 2
 DEFAULT_CHEAP_PM_HOURS = 2
 
+# Taryfy dystrybucyjne i ceny końcowe (PLN/kWh)
+TARIFF_G11: Final = "G11"
+TARIFF_G12: Final = "G12"
+TARIFF_G12W: Final = "G12w"
+TARIFF_G12N: Final = "G12n"
+TARIFF_G13: Final = "G13"
+TARIFFS: Final = [TARIFF_G11, TARIFF_G12, TARIFF_G12W, TARIFF_G12N, TARIFF_G13]
+# Brak taryfy = sensory krzywych cen końcowych wyłączone
+TARIFF_NONE: Final = "none"
+
+DEFAULT_TARIFF = TARIFF_NONE
+DEFAULT_DISTRIBUTION_PEAK = 0.35
+DEFAULT_DISTRIBUTION_OFFPEAK = 0.10
+DEFAULT_TRADE_MARGIN = 0.0
+DEFAULT_EXCISE = 0.005
+DEFAULT_VAT = 23.0
+DEFAULT_NET_BILLING_COEF = 1.0
+
+CURVE_NET_BUY: Final = "net_buy"
+CURVE_NET_SELL: Final = "net_sell"
+CURVES: Final = [CURVE_NET_BUY, CURVE_NET_SELL]
+CURVE_UNIT: Final = "kWh"
+
+# Historia cen i prognoza
+STORAGE_KEY: Final = "rce_pse_tommyleesue_history"
+STORAGE_VERSION: Final = 1
+HISTORY_MAX_DAYS = 1100
+
+FORECAST_SEASONAL_NAIVE: Final = "seasonal_naive"
+FORECAST_WEEKDAY_PROFILE: Final = "weekday_profile"
+FORECAST_REGRESSION: Final = "regression"
+FORECAST_METHODS: Final = [
+    FORECAST_SEASONAL_NAIVE,
+    FORECAST_WEEKDAY_PROFILE,
+    FORECAST_REGRESSION,
+]
+DEFAULT_FORECAST_DAYS = 0
+DEFAULT_FORECAST_METHOD = FORECAST_WEEKDAY_PROFILE
+
+# Sygnał dispatchera wysyłany gdy w historii pojawią się nowe/zmienione dni
+SIGNAL_DATA_UPDATED: Final = f"{DOMAIN}_data_updated"
+
+# WebSocket API
+RESOLUTION_HOUR: Final = "hour"
+RESOLUTION_QUARTER: Final = "quarter"
+RESOLUTIONS: Final = [RESOLUTION_HOUR, RESOLUTION_QUARTER]
+MAX_SERIES_DAYS = 366
+
+# Współdzielony cache odpowiedzi API (wiele instancji HA na jednym hoście)
+DEFAULT_SHARED_CACHE_DIR = ""
+SHARED_CACHE_MAX_AGE = timedelta(minutes=30)
+SHARED_CACHE_RETENTION = timedelta(days=7)
+
+# Ranking kroczący (0 = wyłączony)
+DEFAULT_ROLLING_HOURS = 0
+MAX_ROLLING_HOURS = 48
+
+# Kompletność danych
+QUALITY_COMPLETE: Final = "complete"
+QUALITY_PARTIAL: Final = "partial"
+QUALITY_EMPTY: Final = "empty"
+QUARTERS_PER_HOUR = 4
+PARTIAL_REFETCH_INTERVAL = timedelta(minutes=15)
+PSE_TIME_ZONE: Final = "Europe/Warsaw"
+
+# Agregacja kwadransów do godzin
+AGGREGATION_INTERVAL_END: Final = "interval_end"
+AGGREGATION_INTERVAL_START: Final = "interval_start"
+AGGREGATION_MIN: Final = "min"
+AGGREGATION_MAX: Final = "max"
+AGGREGATION_WEIGHTED: Final = "weighted"
+AGGREGATIONS: Final = [
+    AGGREGATION_INTERVAL_END,
+    AGGREGATION_INTERVAL_START,
+    AGGREGATION_MIN,
+    AGGREGATION_MAX,
+    AGGREGATION_WEIGHTED,
+]
+DEFAULT_AGGREGATION = AGGREGATION_INTERVAL_END
+DEFAULT_QUARTER_WEIGHTS = "1,1,1,1"
+
+# Licznik kosztów energii (puste = wyłączony)
+DEFAULT_ENERGY_METER = ""
+ENERGY_UNIT_FACTORS: Final = {"Wh": 0.001, "kWh": 1.0, "MWh": 1000.0}
+
+# Usługi (domena usług musi być slugiem - bez myślnika z DOMAIN)
+SERVICE_DOMAIN: Final = "rce_pse"
+SERVICE_EXPORT_PRICES: Final = "export_prices"
+EXPORT_FORMAT_CSV: Final = "csv"
+EXPORT_FORMAT_PARQUET: Final = "parquet"
+EXPORT_FORMATS: Final = [EXPORT_FORMAT_CSV, EXPORT_FORMAT_PARQUET]
+EXPORT_DIR: Final = "rce_pse_exports"
+EXPORT_CHUNK_DAYS = 31
+# Maksymalny zakres jednego eksportu (dni) - najwyżej 12 zapytań o zakres do API
+EXPORT_MAX_DAYS = 366
+
+# Symulacja strategii na historii cen
+SERVICE_BACKTEST: Final = "backtest"
+BACKTEST_MODE_DAY: Final = "day"
+BACKTEST_MODE_HALVES: Final = "halves"
+BACKTEST_MODES: Final = [BACKTEST_MODE_DAY, BACKTEST_MODE_HALVES]
+DEFAULT_BACKTEST_DAYS = 30
+
 CONF_CUSTOM_PEAK_RANGE: Final = "custom_peak_range"
 CONF_EXPENSIVE_HOURS: Final = "expensive_hours"
 CONF_CHEAP_HOURS: Final = "cheap_hours"
@@ -23,6 +126,20 @@ CONF_EXPENSIVE_AM_HOURS = "expensive_am_hours"
 CONF_CHEAP_AM_HOURS = "cheap_am_hours"
 CONF_EXPENSIVE_PM_HOURS = "expensive_pm_hours"
 CONF_CHEAP_PM_HOURS = "cheap_pm_hours"
+CONF_TARIFF: Final = "tariff"
+CONF_DISTRIBUTION_PEAK: Final = "distribution_peak"
+CONF_DISTRIBUTION_OFFPEAK: Final = "distribution_offpeak"
+CONF_TRADE_MARGIN: Final = "trade_margin"
+CONF_EXCISE: Final = "excise"
+CONF_VAT: Final = "vat"
+CONF_NET_BILLING_COEF: Final = "net_billing_coef"
+CONF_FORECAST_DAYS: Final = "forecast_days"
+CONF_FORECAST_METHOD: Final = "forecast_method"
+CONF_SHARED_CACHE_DIR: Final = "shared_cache_dir"
+CONF_ROLLING_HOURS: Final = "rolling_hours"
+CONF_AGGREGATION: Final = "aggregation"
+CONF_QUARTER_WEIGHTS: Final = "quarter_weights"
+CONF_ENERGY_METER: Final = "energy_meter"
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -0,0 +1,228 @@
+"""Strumieniowy eksport historii cen rce_pse-tommyleesue do CSV / Parquet."""
+from __future__ import annotations
+
+import csv
+from datetime import date, datetime, time, timedelta
+import logging
+import os
+import tempfile
+
+import orjson
+import requests
+
+from homeassistant.exceptions import HomeAssistantError
+
+from .aggregation import day_from_values
+from .const import EXPORT_CHUNK_DAYS, EXPORT_FORMAT_PARQUET, QUARTERS_PER_HOUR
+from .history import day_from_entry
+from .ranking import PriceRanking
+from .websocket_api import FLAG_COLUMNS
+
+_LOGGER = logging.getLogger(__name__)
+
+# URL API PSE (v2) dla zakresu dni
+URL_BULK = (
+    "https://v2.api.raporty.pse.pl/api/rce-pln"
+    "?$filter=business_date ge '{start}' and business_date le '{end}'"
+    "&$select=business_date,dtime,rce_pln"
+    "&$orderby=dtime"
+)
+
+# Jeden wiersz na kwadrans; cena, ranking i flagi godziny są powtarzane
+COLUMNS = (
+    "date",
+    "hour",
+    "quarter",
+    "time",
+    "quarter_price",
+    "hour_price",
+    "rank",
+    *FLAG_COLUMNS,
+    "source",
+)
+
+
+def _day_rows(day_date: date, day, source: str):
+    """Zwróć wiersze eksportu dla ocenionego dnia."""
+    midnight = datetime.combine(day_date, time())
+    for item in day:
+        quarters = (list(item.get("quarters") or ()) + [None] * QUARTERS_PER_HOUR)[:QUARTERS_PER_HOUR]
+        flags = tuple(item.get(flag) for flag in FLAG_COLUMNS)
+        for k, price in enumerate(quarters):
+            start = midnight + timedelta(hours=item["hour"] - 1, minutes=15 * k)
+            yield (
+                day_date.isoformat(),
+                item["hour"],
+                k + 1,
+                start.strftime("%Y-%m-%d %H:%M"),
+                price,
+                item["tariff"],
+                item.get("price_rank"),
+                *flags,
+                source,
+            )
+
+
+def fetch_range(start: date, end: date) -> dict:
+    """
+    Pobierz zakres dni jednym zapytaniem (wywoływane w executorze).
+
+    Zwraca słownik data -> lista punktów API; kolejne strony odpowiedzi
+    (@odata.nextLink) są pobierane do wyczerpania. Przy błędzie zwracane
+    są dni pobrane do tego momentu.
+    """
+    range_str = f"{start.isoformat()}..{end.isoformat()}"
+    url = URL_BULK.format(start=start.isoformat(), end=end.isoformat())
+    values_by_day = {}
+
+    while url:
+        try:
+            response = requests.get(url, timeout=30)
+            response.raise_for_status()
+            json_data = orjson.loads(response.content)
+        except requests.exceptions.RequestException as e:
+            _LOGGER.error("Błąd przy pobieraniu danych PSE dla %s: %s", range_str, e)
+            break
+        except orjson.JSONDecodeError:
+            _LOGGER.error("Nieprawidłowa odpowiedź JSON z API PSE dla %s", range_str)
+            break
+
+        for item in json_data.get("value") or ():
+            try:
+                day_date = date.fromisoformat(item["business_date"][:10])
+            except (KeyError, TypeError, ValueError):
+                continue
+            values_by_day.setdefault(day_date, []).append(item)
+        url = json_data.get("@odata.nextLink")
+
+    return values_by_day
+
+
+def _iter_chunks(
+    dates: list[date],
+    entries: dict,
+    ranking: PriceRanking,
+    aggregation: str,
+    weights: tuple,
+    written: list,
+):
+    """
+    Generuj wiersze paczkami po EXPORT_CHUNK_DAYS dni.
+
+    Dni z lokalnej historii są tylko oceniane; brakujące dni paczki są
+    pobierane z API jednym zapytaniem o zakres i agregowane według
+    `aggregation` / `weights`. Zapisane dni są dopisywane do `written`.
+    W pamięci jest naraz tylko jedna paczka.
+    """
+    for i in range(0, len(dates), EXPORT_CHUNK_DAYS):
+        chunk = dates[i:i + EXPORT_CHUNK_DAYS]
+        missing = [day_date for day_date in chunk if day_date not in entries]
+        fetched = fetch_range(missing[0], missing[-1]) if missing else {}
+
+        rows = []
+        for day_date in chunk:
+            entry = entries.get(day_date)
+            if entry is not None:
+                day = day_from_entry(day_date, entry)
+                source = "history"
+            elif fetched.get(day_date):
+                day = day_from_values(fetched[day_date], day_date, aggregation, weights)
+                source = "api"
+            else:
+                continue
+            ranking.rank(day)
+            rows.extend(_day_rows(day_date, day, source))
+            written.append(day_date)
+        yield rows
+
+
+def _write_csv(path: str, chunks) -> int:
+    """Zapisz paczki wierszy do pliku CSV."""
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(COLUMNS)
+        for rows in chunks:
+            writer.writerows(rows)
+            count += len(rows)
+    return count
+
+
+def _write_parquet(path: str, chunks) -> int:
+    """Zapisz paczki wierszy do pliku Parquet (jedna grupa wierszy na paczkę)."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise HomeAssistantError(
+            "Eksport do Parquet wymaga pakietu pyarrow - użyj formatu csv"
+        ) from e
+
+    schema = pa.schema([
+        ("date", pa.string()),
+        ("hour", pa.int8()),
+        ("quarter", pa.int8()),
+        ("time", pa.string()),
+        ("quarter_price", pa.float64()),
+        ("hour_price", pa.float64()),
+        ("rank", pa.int8()),
+        *((flag, pa.bool_()) for flag in FLAG_COLUMNS),
+        ("source", pa.string()),
+    ])
+
+    count = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for rows in chunks:
+            if not rows:
+                continue
+            columns = list(zip(*rows))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                schema=schema,
+            ))
+            count += len(rows)
+    return count
+
+
+def export_prices(
+    path: str,
+    export_format: str,
+    dates: list[date],
+    entries: dict,
+    ranking: PriceRanking,
+    aggregation: str,
+    weights: tuple,
+) -> dict:
+    """
+    Wyeksportuj ceny z zakresu dat do pliku (wywoływane w executorze).
+
+    `entries` to migawka wpisów historii (data -> wpis), `ranking`,
+    `aggregation` i `weights` to bieżące ustawienia sensora. Plik jest
+    zapisywany atomowo. Zwraca liczbę wierszy, liczbę zapisanych dni oraz
+    dni, których nie było w historii ani w odpowiedzi API.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    tmp = tempfile.NamedTemporaryFile(dir=directory, prefix=".rce-export-", delete=False)
+    tmp.close()
+
+    writer = _write_parquet if export_format == EXPORT_FORMAT_PARQUET else _write_csv
+    written = []
+    try:
+        count = writer(
+            tmp.name, _iter_chunks(dates, entries, ranking, aggregation, weights, written)
+        )
+        os.replace(tmp.name, path)
+    except BaseException:
+        os.unlink(tmp.name)
+        raise
+
+    written_set = set(written)
+    days_missing = [day_date.isoformat() for day_date in dates if day_date not in written_set]
+    if days_missing:
+        _LOGGER.warning(
+            "Eksport do %s bez %s dni (brak w historii i w API): %s",
+            path, len(days_missing), ", ".join(days_missing),
+        )
+    _LOGGER.info("Wyeksportowano %s wierszy cen do %s", count, path)
+    return {"rows": count, "days": len(written), "days_missing": days_missing}
@@ -0,0 +1,155 @@
+"""Lekka prognoza cen RCE na kolejne dni na podstawie lokalnej historii."""
+from __future__ import annotations
+
+from datetime import date, timedelta
+from statistics import mean
+
+from .const import (
+    FORECAST_SEASONAL_NAIVE,
+    FORECAST_WEEKDAY_PROFILE,
+    FORECAST_REGRESSION,
+)
+
+# Waga nowej obserwacji w profilu dnia tygodnia (EWMA)
+PROFILE_ALPHA = 0.3
+# Minimalna liczba par (dzień poprzedni, dzień) dla regresji godzinowej
+REGRESSION_MIN_SAMPLES = 5
+# Liczba ostatnich dni przechowywanych dla prognozy naiwnej sezonowej
+RECENT_DAYS = 8
+
+
+class PriceForecaster:
+    """
+    Prognoza przyrostowa cen godzinowych (1-24).
+
+    Metody:
+    - seasonal_naive: ten sam dzień tygodnia sprzed tygodnia (lub ostatni znany dzień),
+    - weekday_profile: wygładzony wykładniczo profil godzinowy dla każdego dnia tygodnia,
+    - regression: dla każdej godziny y = a + b * cena z dnia poprzedniego.
+
+    Uczenie (learn_days) i prognoza (forecast) są czysto obliczeniowe i powinny
+    być wywoływane w executorze.
+    """
+
+    def __init__(self, method: str) -> None:
+        """Inicjalizacja prognozy."""
+        self.method = method
+        self._last_learned: date | None = None
+        self._recent: dict[date, list] = {}
+        self._profile: list[list] = [[None] * 24 for _ in range(7)]
+        # Statystyki regresji dla każdej godziny: n, sx, sy, sxx, sxy
+        self._reg = [[0, 0.0, 0.0, 0.0, 0.0] for _ in range(24)]
+
+    def learn_days(self, days) -> None:
+        """Naucz model na liście (data, ceny godzinowe) posortowanej rosnąco po dacie."""
+        for day_date, hourly in days:
+            self._learn(day_date, hourly)
+
+    def _learn(self, day_date: date, hourly) -> None:
+        """Przyrostowo dodaj jeden dzień do modelu."""
+        if self._last_learned is not None and day_date <= self._last_learned:
+            return
+
+        profile = self._profile[day_date.weekday()]
+        for hour, price in enumerate(hourly):
+            if price is None:
+                continue
+            if profile[hour] is None:
+                profile[hour] = price
+            else:
+                profile[hour] += PROFILE_ALPHA * (price - profile[hour])
+
+        previous = self._recent.get(day_date - timedelta(days=1))
+        if previous is not None:
+            for hour, (x, y) in enumerate(zip(previous, hourly)):
+                if x is None or y is None:
+                    continue
+                stats = self._reg[hour]
+                stats[0] += 1
+                stats[1] += x
+                stats[2] += y
+                stats[3] += x * x
+                stats[4] += x * y
+
+        self._recent[day_date] = list(hourly)
+        for old in sorted(self._recent)[:-RECENT_DAYS]:
+            del self._recent[old]
+        self._last_learned = day_date
+
+    def forecast(self, known: dict, start: date, days: int) -> list[tuple[date, list]]:
+        """
+        Prognozuj `days` kolejnych dni od `start`.
+
+        `known` to słownik data -> ceny godzinowe (np. dziś i jutro), kolejne
+        dni prognozy korzystają z wcześniej prognozowanych wartości.
+        Zwraca listę (data, dzień w formacie json_to_day_raw z flagą estimated).
+        """
+        series = dict(self._recent)
+        series.update({d: h for d, h in known.items() if h})
+        result = []
+
+        for offset in range(days):
+            target = start + timedelta(days=offset)
+            hourly = self._predict(target, series)
+            if hourly is None:
+                break
+            series[target] = hourly
+            result.append((target, [
+                {
+                    "hour": hour,
+                    "start": f"{hour-1:02d}:00",
+                    "tariff": price,
+                    "quarters_count": 0,
+                    "estimated": True,
+                }
+                for hour, price in enumerate(hourly, start=1)
+            ]))
+
+        return result
+
+    def _predict(self, target: date, series: dict):
+        """Prognoza jednego dnia; None jeśli brak danych."""
+        if not series:
+            return None
+
+        latest = series[max(series)]
+        previous = series.get(target - timedelta(days=1), latest)
+        naive = series.get(target - timedelta(days=7), previous)
+
+        if self.method == FORECAST_SEASONAL_NAIVE:
+            return self._fill(naive, latest)
+
+        if self.method == FORECAST_WEEKDAY_PROFILE:
+            profile = self._profile[target.weekday()]
+            return self._fill(
+                [round(p, 2) if p is not None else None for p in profile], naive
+            )
+
+        if self.method == FORECAST_REGRESSION:
+            predicted = []
+            for hour, stats in enumerate(self._reg):
+                n, sx, sy, sxx, sxy = stats
+                x = previous[hour]
+                denominator = n * sxx - sx * sx
+                if x is None or n < REGRESSION_MIN_SAMPLES or denominator == 0:
+                    predicted.append(None)
+                    continue
+                b = (n * sxy - sx * sy) / denominator
+                a = (sy - b * sx) / n
+                predicted.append(round(a + b * x, 2))
+            return self._fill(predicted, naive)
+
+        return None
+
+    @staticmethod
+    def _fill(primary, fallback):
+        """Uzupełnij brakujące godziny wartościami zapasowymi lub średnią."""
+        filled = [
+            p if p is not None else f
+            for p, f in zip(primary, fallback)
+        ]
+        valid = [p for p in filled if p is not None]
+        if not valid:
+            return None
+        day_mean = round(mean(valid), 2)
+        return [p if p is not None else day_mean for p in filled]
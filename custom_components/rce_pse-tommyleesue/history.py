@@ -0,0 +1,109 @@
+"""Lokalna historia cen dobowych dla rce_pse-tommyleesue."""
+from __future__ import annotations
+
+from datetime import date
+import logging
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .aggregation import expected_hours, hour_complete
+from .const import STORAGE_KEY, STORAGE_VERSION, HISTORY_MAX_DAYS
+
+_LOGGER = logging.getLogger(__name__)
+
+# Opóźnienie zapisu do .storage (sekundy)
+SAVE_DELAY = 30
+
+
+def day_from_entry(day_date: date, entry) -> list[dict]:
+    """
+    Odtwórz godziny dnia (format json_to_day_raw, bez rankingu) z wpisu historii.
+
+    Kompletność godzin jest wyznaczana z liczby kwadransów tak samo jak
+    przy budowie dnia z API, więc ranking dostaje poprawne rank_incomplete.
+    """
+    quarters_by_hour = entry.get("quarters") or [[] for _ in entry["hourly"]]
+    day_hours = expected_hours(day_date)
+    day = []
+    for hour, (price, quarters) in enumerate(zip(entry["hourly"], quarters_by_hour), start=1):
+        present = sum(q is not None for q in quarters)
+        day.append({
+            "hour": hour,
+            "start": f"{hour-1:02d}:00",
+            "tariff": price,
+            "quarters_count": present,
+            "quarters": list(quarters),
+            "complete": hour_complete(present, hour, day_hours),
+        })
+    return day
+
+
+class PriceHistory:
+    """
+    Historia godzinowych cen RCE (PLN/MWh) zapisywana w .storage.
+
+    Dni są przechowywane pod kluczem daty w formacie ISO jako:
+    - hourly: lista 24 cen (godziny 1-24, None = brak danych),
+    - quarters: 24 listy surowych cen kwadransowych przypisanych do godzin
+      (None = brak kwadransu).
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Inicjalizacja historii."""
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._days: dict[str, dict] = {}
+
+    async def async_load(self) -> None:
+        """Wczytaj historię z dysku."""
+        data = await self._store.async_load()
+        if data and isinstance(data.get("days"), dict):
+            self._days = data["days"]
+        _LOGGER.debug("Wczytano historię cen: %s dni", len(self._days))
+
+    def add_day(self, day_date: date, day) -> bool:
+        """
+        Zapisz dzień w formacie json_to_day_raw.
+
+        Zwraca True jeśli dzień jest nowy lub zmienił się.
+        """
+        hourly = [item["tariff"] for item in day]
+        if all(price is None for price in hourly):
+            return False
+        quarters = [list(item.get("quarters", ())) for item in day]
+
+        key = day_date.isoformat()
+        entry = self._days.get(key)
+        if (
+            entry is not None
+            and entry.get("hourly") == hourly
+            and entry.get("quarters") == quarters
+        ):
+            return False
+
+        self._days[key] = {"hourly": hourly, "quarters": quarters}
+        self._trim()
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+        return True
+
+    def get_entry(self, day_date: date):
+        """Zwróć zapisany dzień (hourly, quarters) lub None."""
+        return self._days.get(day_date.isoformat())
+
+    def items(self) -> list[tuple[date, list]]:
+        """Zwróć posortowaną kopię historii jako (data, ceny godzinowe)."""
+        return [
+            (date.fromisoformat(key), list(self._days[key]["hourly"]))
+            for key in sorted(self._days)
+        ]
+
+    def _trim(self) -> None:
+        """Usuń najstarsze dni ponad limit HISTORY_MAX_DAYS."""
+        if len(self._days) <= HISTORY_MAX_DAYS:
+            return
+        for key in sorted(self._days)[: len(self._days) - HISTORY_MAX_DAYS]:
+            del self._days[key]
+
+    def _data_to_save(self) -> dict:
+        """Dane do zapisu w .storage."""
+        return {"days": self._days}
@@ -0,0 +1,208 @@
+"""Ranking cen godzinowych i flagi tanich / drogich godzin dla rce_pse-tommyleesue."""
+from __future__ import annotations
+
+import logging
+
+from .const import DEFAULT_CUSTOM_PEAK_RANGE
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def parse_peak_range(value: str) -> tuple[int, int]:
+    """
+    Zwróć (początek, koniec) zakresu szczytu "od-do" w godzinach 1-24.
+
+    Zgłasza ValueError przy nieprawidłowym formacie lub zakresie.
+    """
+    try:
+        start_str, end_str = value.split("-")
+        start, end = int(start_str), int(end_str)
+    except (ValueError, AttributeError) as e:
+        raise ValueError(f"Nieprawidłowy format zakresu: {value}") from e
+    if not (1 <= start <= 24 and 1 <= end <= 25 and start < end):
+        raise ValueError(f"Nieprawidłowy zakres godzin: {value}")
+    return start, end
+
+
+class PriceRanking:
+    """
+    Parametry rankingu (liczby tanich / drogich godzin, zakres szczytu)
+    i ocena dnia według nich.
+
+    Używany przez sensory (RCESensor._calculate_price_ranking) oraz
+    symulację strategii, która tworzy własne progi bez kopiowania encji.
+    """
+
+    def __init__(
+        self,
+        custom_peak: str,
+        cheap_hours: int,
+        expensive_hours: int,
+        cheap_am_hours: int,
+        expensive_am_hours: int,
+        cheap_pm_hours: int,
+        expensive_pm_hours: int,
+    ) -> None:
+        """Ustaw parametry rankingu i zakresu szczytu (z walidacją)."""
+        self.cheap_am_hours = min(max(cheap_am_hours, 1), 12)
+        self.expensive_am_hours = min(max(expensive_am_hours, 1), 12)
+        self.cheap_pm_hours = min(max(cheap_pm_hours, 1), 12)
+        self.expensive_pm_hours = min(max(expensive_pm_hours, 1), 12)
+
+        # Walidacja i parsowanie zakresu customowego szczytu
+        try:
+            self.custom_peak_start, self.custom_peak_end = parse_peak_range(custom_peak)
+        except ValueError:
+            _LOGGER.warning("Nieprawidłowy format custom_peak: %s. Używam domyślnego.", custom_peak)
+            self.custom_peak_start, self.custom_peak_end = parse_peak_range(
+                DEFAULT_CUSTOM_PEAK_RANGE
+            )
+        
+        # Konfiguracja z opcji integracji
+        self.cheap_hours = min(max(cheap_hours, 1), 24)
+        self.expensive_hours = min(max(expensive_hours, 1), 24)
+
+    @property
+    def peak_range(self) -> str:
+        """Zakres szczytu w formacie opcji "od-do"."""
+        return f"{self.custom_peak_start}-{self.custom_peak_end}"
+
+    def rank(self, day):
+        """
+        Oblicz ranking cenowy dla godzin dnia.
+        
+        Ranking: 1 = najtańsza godzina, 24 = najdroższa godzina.
+        Dodaje flagi h_price (drogie godziny) i l_price (tanie godziny)
+        oraz rank_incomplete, gdy ranking liczono na niepełnych danych.
+        """
+        if not day:
+            return
+
+        # Oznacz ranking liczony na niepełnym dniu
+        rank_incomplete = any(not item.get("complete", True) for item in day)
+        for item in day:
+            item["rank_incomplete"] = rank_incomplete
+        
+        # Filtruj godziny z prawidłowymi danymi
+        valid_hours = [(i, item) for i, item in enumerate(day) if item["tariff"] is not None]
+        
+        if not valid_hours:
+            return
+        
+        # Sortuj po cenie (rosnąco)
+        sorted_hours = sorted(valid_hours, key=lambda x: x[1]["tariff"])
+        
+        # Przypisz rankingi (1-24 zamiast 0-23)
+        rank = 1
+        prev_price = None
+        same_price_count = 0
+        
+        for position, (index, hour_data) in enumerate(sorted_hours):
+            current_price = hour_data["tariff"]
+            
+            if prev_price is None or current_price != prev_price:
+                rank = position + 1
+                prev_price = current_price
+                same_price_count = 1
+            else:
+                same_price_count += 1
+            
+            day[index]["price_rank"] = rank
+            day[index]["price_position"] = position + 1
+        
+        # Dodaj ranking procentowy
+        for index, hour_data in enumerate(day):
+            if hour_data["tariff"] is not None and "price_position" in hour_data:
+                position = hour_data["price_position"]
+                percentile = round((position - 1) / 23 * 100, 1) if len(valid_hours) > 1 else 50
+                day[index]["price_percentile"] = percentile
+        
+        # PODZIEL NA AM (godziny 1-12) i PM (godziny 13-24)
+        am_hours = [(i, item) for i, item in enumerate(day[:12]) if item["tariff"] is not None]
+        pm_hours = [(i, item) for i, item in enumerate(day[12:], start=12) if item["tariff"] is not None]
+        
+        # RANKING AM (godziny 1-12)
+        if am_hours:
+            sorted_am = sorted(am_hours, key=lambda x: x[1]["tariff"])
+            
+            am_rank = 1
+            prev_price = None
+            for position, (index, hour_data) in enumerate(sorted_am):
+                current_price = hour_data["tariff"]
+                if prev_price is None or current_price != prev_price:
+                    am_rank = position + 1
+                    prev_price = current_price
+                day[index]["am_rank"] = am_rank
+                
+        # RANKING PM (godziny 13-24)
+        if pm_hours:
+            sorted_pm = sorted(pm_hours, key=lambda x: x[1]["tariff"])
+            
+            pm_rank = 1
+            prev_price = None
+            for position, (index, hour_data) in enumerate(sorted_pm):
+                current_price = hour_data["tariff"]
+                if prev_price is None or current_price != prev_price:
+                    pm_rank = position + 1
+                    prev_price = current_price
+                day[index]["pm_rank"] = pm_rank
+        
+        # Dodaj flagi AM (tylko dla godzin 1-12)
+        total_am_hours = len(am_hours)
+        for index, hour_data in enumerate(day[:12]):
+            if hour_data["tariff"] is not None:
+                am_rank_value = hour_data.get("am_rank")
+                
+                if am_rank_value and am_rank_value <= self.cheap_am_hours:
+                    day[index]["am_l_price"] = True
+                else:
+                    day[index]["am_l_price"] = False
+                
+                if am_rank_value and am_rank_value > total_am_hours - self.expensive_am_hours:
+                    day[index]["am_h_price"] = True
+                else:
+                    day[index]["am_h_price"] = False
+            else:
+                day[index]["am_l_price"] = False
+                day[index]["am_h_price"] = False
+        
+        # Dodaj flagi PM (tylko dla godzin 13-24)
+        total_pm_hours = len(pm_hours)
+        for index, hour_data in enumerate(day[12:], start=12):
+            if hour_data["tariff"] is not None:
+                pm_rank_value = hour_data.get("pm_rank")
+                
+                if pm_rank_value and pm_rank_value <= self.cheap_pm_hours:
+                    day[index]["pm_l_price"] = True
+                else:
+                    day[index]["pm_l_price"] = False
+                
+                if pm_rank_value and pm_rank_value > total_pm_hours - self.expensive_pm_hours:
+                    day[index]["pm_h_price"] = True
+                else:
+                    day[index]["pm_h_price"] = False
+            else:
+                day[index]["pm_l_price"] = False
+                day[index]["pm_h_price"] = False
+            
+            # Dodaj flagi h_price i l_price
+            total_valid_hours = len(valid_hours)
+            
+            for index, hour_data in enumerate(day):
+                if hour_data["tariff"] is not None:
+                    rank_value = hour_data.get("price_rank")
+                    
+                    # l_price = true dla najtańszych godzin (cheap_hours)
+                    if rank_value and rank_value <= self.cheap_hours:
+                        day[index]["l_price"] = True
+                    else:
+                        day[index]["l_price"] = False
+                    
+                    # h_price = true dla najdroższych godzin (expensive_hours)
+                    if rank_value and rank_value > total_valid_hours - self.expensive_hours:
+                        day[index]["h_price"] = True
+                    else:
+                        day[index]["h_price"] = False
+                else:
+                    day[index]["l_price"] = False
+                    day[index]["h_price"] = False
@@ -0,0 +1,78 @@
+"""Ranking cen w przesuwnym oknie godzin obejmującym granicę doby."""
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from collections import deque
+from datetime import date, timedelta
+
+
+def next_slot(key: tuple[date, int]) -> tuple[date, int]:
+    """Zwróć klucz kolejnej godziny (data, godzina 1-24)."""
+    day_date, hour = key
+    if hour >= 24:
+        return day_date + timedelta(days=1), 1
+    return day_date, hour + 1
+
+
+class RollingRanking:
+    """
+    Ranking N kolejnych godzin licząc od bieżącej, przez dziś i jutro.
+
+    Okno jest aktualizowane przyrostowo: na granicy godziny wygasła godzina
+    jest usuwana z posortowanej listy cen, a nowe godziny są do niej
+    wstawiane (bisect) - bez ponownego sortowania całego okna.
+    Ranking jak w _calculate_price_ranking: 1 = najtańsza, równe ceny mają
+    ten sam ranking.
+    """
+
+    def __init__(self, size: int) -> None:
+        """Inicjalizacja okna."""
+        self.size = size
+        self._window: deque = deque()
+        self._sorted: list[float] = []
+
+    def reset(self) -> None:
+        """Wyczyść okno (po zmianie cen w już ocenionych godzinach)."""
+        self._window.clear()
+        self._sorted.clear()
+
+    def advance(self, current: tuple[date, int], prices: dict) -> bool:
+        """
+        Przesuń okno tak, aby zaczynało się od bieżącej godziny.
+
+        `prices` to słownik (data, godzina 1-24) -> cena lub None.
+        Zwraca True jeśli zawartość okna się zmieniła.
+        """
+        changed = False
+
+        while self._window and self._window[0][0] < current:
+            _, price = self._window.popleft()
+            if price is not None:
+                del self._sorted[bisect_left(self._sorted, price)]
+            changed = True
+
+        next_key = next_slot(self._window[-1][0]) if self._window else current
+        while len(self._window) < self.size and next_key in prices:
+            price = prices[next_key]
+            self._window.append((next_key, price))
+            if price is not None:
+                insort(self._sorted, price)
+            next_key = next_slot(next_key)
+            changed = True
+
+        return changed
+
+    @property
+    def count(self) -> int:
+        """Liczba godzin z cenami w oknie."""
+        return len(self._sorted)
+
+    def rank(self, price) -> int | None:
+        """Ranking ceny w oknie (1 = najtańsza)."""
+        if price is None:
+            return None
+        return bisect_left(self._sorted, price) + 1
+
+    def slots(self):
+        """Zwróć (klucz, cena, ranking) dla godzin w oknie w kolejności czasu."""
+        return [(key, price, self.rank(price)) for key, price in self._window]
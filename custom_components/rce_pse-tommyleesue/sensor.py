@@ -1,22 +1,27 @@
 """Platforma do integracji sensora cen energii rce_pse-tommyleesue."""
 from __future__ import annotations
 
-import json
 import logging
+import orjson
 import requests
 from statistics import mean, median
 from zoneinfo import ZoneInfo
-from datetime import datetime, timedelta, timezone
-from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
     SensorEntity,
     SensorStateClass,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import Event, HomeAssistant, callback
 from homeassistant import config_entries
 from homeassistant.helpers.device_registry import DeviceEntryType
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import (
+    async_track_state_change_event,
+    async_track_time_change,
+)
+from homeassistant.helpers.restore_state import RestoreEntity
 
 from .const import (
     DOMAIN,
@@ -36,10 +41,67 @@ from .const import (
     DEFAULT_EXPENSIVE_AM_HOURS,
     DEFAULT_CHEAP_PM_HOURS,
     DEFAULT_EXPENSIVE_PM_HOURS,
+    CURVES,
+    CURVE_NET_BUY,
+    CURVE_UNIT,
+    CONF_FORECAST_DAYS,
+    CONF_FORECAST_METHOD,
+    DEFAULT_FORECAST_DAYS,
+    DEFAULT_FORECAST_METHOD,
+    SIGNAL_DATA_UPDATED,
+    CONF_SHARED_CACHE_DIR,
+    DEFAULT_SHARED_CACHE_DIR,
+    CONF_ROLLING_HOURS,
+    DEFAULT_ROLLING_HOURS,
+    MAX_ROLLING_HOURS,
+    QUALITY_COMPLETE,
+    QUALITY_PARTIAL,
+    QUALITY_EMPTY,
+    QUARTERS_PER_HOUR,
+    PARTIAL_REFETCH_INTERVAL,
+    CONF_AGGREGATION,
+    CONF_QUARTER_WEIGHTS,
+    DEFAULT_AGGREGATION,
+    DEFAULT_QUARTER_WEIGHTS,
+    CONF_ENERGY_METER,
+    DEFAULT_ENERGY_METER,
+    ENERGY_UNIT_FACTORS,
+)
+from .aggregation import (
+    alignment_offset,
+    bucket_quarters,
+    build_day,
+    day_from_values,
+    expected_hours,
+    flatten_day,
+    quarter_weights_from_option,
+    realign,
 )
+from .cache import SharedDayCache
+from .forecast import PriceForecaster
+from .ranking import PriceRanking
+from .rolling import RollingRanking
+from .tariffs import build_price_curves, quarter_buy_prices, tariff_config_from_options
 
 _LOGGER = logging.getLogger(__name__)
 
+
+def _quarter_dtime(day_date: date, hour: int, quarter: int) -> str:
+    """Zwróć dtime przesunięty o `quarter` kwadransów od początku godziny 1-24."""
+    moment = datetime.combine(day_date, time()) + timedelta(
+        hours=hour - 1, minutes=15 * quarter
+    )
+    return moment.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _day_quality(day):
+    """Zwróć (jakość danych, lista niekompletnych godzin) dla dnia."""
+    if not day:
+        return QUALITY_EMPTY, []
+    missing = [item["hour"] for item in day if not item.get("complete", True)]
+    return (QUALITY_PARTIAL if missing else QUALITY_COMPLETE), missing
+
+
 # URL API PSE (v2) - zwraca dane w odstępach 15-minutowych
 URL = (
     "https://v2.api.raporty.pse.pl/api/rce-pln"
@@ -48,6 +110,27 @@ URL = (
     "&$orderby=dtime"
 )
 
+# URL API PSE (v2) ograniczony do zakresu dtime - do uzupełniania braków
+URL_RANGE = (
+    "https://v2.api.raporty.pse.pl/api/rce-pln"
+    "?$filter=business_date eq '{day}' and dtime ge '{start}' and dtime le '{end}'"
+    "&$select=business_date,dtime,rce_pln"
+    "&$orderby=dtime"
+)
+
+
+def _ranking_options(options):
+    """Odczytaj z opcji parametry rankingu wspólne dla wszystkich sensorów."""
+    return (
+        options.get(CONF_CUSTOM_PEAK_RANGE, DEFAULT_CUSTOM_PEAK_RANGE),
+        options.get(CONF_CHEAP_HOURS, DEFAULT_CHEAP_HOURS),
+        options.get(CONF_EXPENSIVE_HOURS, DEFAULT_EXPENSIVE_HOURS),
+        options.get(CONF_CHEAP_AM_HOURS, DEFAULT_CHEAP_AM_HOURS),
+        options.get(CONF_EXPENSIVE_AM_HOURS, DEFAULT_EXPENSIVE_AM_HOURS),
+        options.get(CONF_CHEAP_PM_HOURS, DEFAULT_CHEAP_PM_HOURS),
+        options.get(CONF_EXPENSIVE_PM_HOURS, DEFAULT_EXPENSIVE_PM_HOURS),
+    )
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -58,41 +141,56 @@ async def async_setup_entry(
     Konfiguracja platformy sensorowej.
     """
     # Pobierz konfigurację z opcji
-    custom_peak = config_entry.options.get(
-        CONF_CUSTOM_PEAK_RANGE, DEFAULT_CUSTOM_PEAK_RANGE
-    )
-    cheap_hours = config_entry.options.get(
-        CONF_CHEAP_HOURS, DEFAULT_CHEAP_HOURS
+    ranking_options = _ranking_options(config_entry.options)
+    tariff_config = tariff_config_from_options(config_entry.options)
+    forecast_days = config_entry.options.get(
+        CONF_FORECAST_DAYS, DEFAULT_FORECAST_DAYS
     )
-    expensive_hours = config_entry.options.get(
-        CONF_EXPENSIVE_HOURS, DEFAULT_EXPENSIVE_HOURS
+    forecast_method = config_entry.options.get(
+        CONF_FORECAST_METHOD, DEFAULT_FORECAST_METHOD
     )
-    cheap_am_hours = config_entry.options.get(
-        CONF_CHEAP_AM_HOURS, DEFAULT_CHEAP_AM_HOURS
+    shared_cache_dir = config_entry.options.get(
+        CONF_SHARED_CACHE_DIR, DEFAULT_SHARED_CACHE_DIR
     )
-    expensive_am_hours = config_entry.options.get(
-        CONF_EXPENSIVE_AM_HOURS, DEFAULT_EXPENSIVE_AM_HOURS
+    rolling_hours = config_entry.options.get(
+        CONF_ROLLING_HOURS, DEFAULT_ROLLING_HOURS
     )
-    cheap_pm_hours = config_entry.options.get(
-        CONF_CHEAP_PM_HOURS, DEFAULT_CHEAP_PM_HOURS
+    aggregation = config_entry.options.get(
+        CONF_AGGREGATION, DEFAULT_AGGREGATION
     )
-    expensive_pm_hours = config_entry.options.get(
-        CONF_EXPENSIVE_PM_HOURS, DEFAULT_EXPENSIVE_PM_HOURS
+    quarter_weights = quarter_weights_from_option(
+        config_entry.options.get(CONF_QUARTER_WEIGHTS, DEFAULT_QUARTER_WEIGHTS)
     )
 
     # Dodaj sensor
     sensor = RCESensor(
         hass,
-        custom_peak,
-        cheap_hours,
-        expensive_hours,
-        cheap_am_hours,
-        expensive_am_hours,
-        cheap_pm_hours,
-        expensive_pm_hours,
+        *ranking_options,
+        tariff_config,
+        hass.data.get(DOMAIN, {}).get("history"),
+        forecast_days,
+        forecast_method,
+        SharedDayCache(shared_cache_dir) if shared_cache_dir else None,
+        rolling_hours,
+        aggregation,
+        quarter_weights,
     )
-    
-    async_add_entities([sensor])
+
+    # Sensory krzywych cen końcowych (zasilane przez główny sensor),
+    # tylko gdy w opcjach wybrano taryfę
+    curve_sensors = [
+        RCEPriceCurveSensor(hass, curve, *ranking_options)
+        for curve in CURVES
+    ] if tariff_config is not None else []
+    sensor.attach_curve_sensors(curve_sensors)
+    hass.data.setdefault(DOMAIN, {})["sensor"] = sensor
+
+    # Licznik kosztów energii (tylko gdy wskazano licznik energii)
+    energy_meter = config_entry.options.get(CONF_ENERGY_METER, DEFAULT_ENERGY_METER)
+    cost_sensors = [RCECostSensor(hass, energy_meter)] if energy_meter else []
+    sensor.attach_cost_sensor(cost_sensors[0] if cost_sensors else None)
+
+    async_add_entities([sensor, *curve_sensors, *cost_sensors])
 
 
 class RCESensor(SensorEntity):
@@ -100,8 +198,9 @@ class RCESensor(SensorEntity):
     Sensor przedstawiający Rynkową Cenę Energii (RCE) z PSE.
     
     Uwaga: 
-    1. Średnia dla godziny X jest liczona z kwadransów:
-       godzina X = średnia z (X:15, X:30, X:45, X+1:00)
+    1. Domyślnie średnia dla godziny X jest liczona z kwadransów:
+       godzina X = średnia z (X:15, X:30, X:45, X+1:00);
+       inne sposoby agregacji wybiera się w opcjach (aggregation.py)
     2. Godziny są numerowane 1-24 (zamiast 0-23)
     """
     
@@ -121,6 +220,14 @@ class RCESensor(SensorEntity):
         expensive_am_hours: int,
         cheap_pm_hours: int,
         expensive_pm_hours: int,
+        tariff_config: dict | None = None,
+        history=None,
+        forecast_days: int = 0,
+        forecast_method: str = DEFAULT_FORECAST_METHOD,
+        shared_cache: SharedDayCache | None = None,
+        rolling_hours: int = 0,
+        aggregation: str = DEFAULT_AGGREGATION,
+        quarter_weights: tuple = (1.0, 1.0, 1.0, 1.0),
     ) -> None:
         """Inicjalizacja sensora."""
         super().__init__()
@@ -137,9 +244,14 @@ class RCESensor(SensorEntity):
         # Ostatni dzień, w którym pobrano dane o 14:00
         self.last_14_update_day = None
 
+        # Dzień, w którym dane jutrzejsze przeniesiono na dziś (bez pobierania)
+        self._rollover_day = None
+
         # Dane cenowe
         self._today = []      # Ceny na dzisiaj (godziny 1-24)
         self._tomorrow = []   # Ceny na jutro (godziny 1-24)
+        self._today_date = None     # Data, której dotyczą dane w self._today
+        self._tomorrow_date = None  # Data, której dotyczą dane w self._tomorrow
 
         # Statystyki cenowe
         self._average = None
@@ -150,284 +262,337 @@ class RCESensor(SensorEntity):
         self._pm_night_avg = None
         self._day_avg = None
         self._custom_peak = None
-        self.cheap_am_hours = min(max(cheap_am_hours, 1), 12)
-        self.expensive_am_hours = min(max(expensive_am_hours, 1), 12)
-        self.cheap_pm_hours = min(max(cheap_pm_hours, 1), 12)
-        self.expensive_pm_hours = min(max(expensive_pm_hours, 1), 12)
-
-        # Walidacja i parsowanie zakresu customowego szczytu
-        try:
-            start_str, end_str = custom_peak.split("-")
-            self.custom_peak_start = int(start_str)
-            self.custom_peak_end = int(end_str)
-            # Sprawdź poprawność zakresu godzin (teraz 1-24)
-            if not (1 <= self.custom_peak_start <= 24 and 
-                    1 <= self.custom_peak_end <= 25 and 
-                    self.custom_peak_start < self.custom_peak_end):
-                raise ValueError("Nieprawidłowy zakres godzin")
-        except (ValueError, AttributeError):
-            _LOGGER.warning("Nieprawidłowy format custom_peak: %s. Używam domyślnego.", custom_peak)
-            default_start, default_end = DEFAULT_CUSTOM_PEAK_RANGE.split("-")
-            self.custom_peak_start = int(default_start)
-            self.custom_peak_end = int(default_end)
-        
-        # Konfiguracja z opcji integracji
-        self.cheap_hours = min(max(cheap_hours, 1), 24)
-        self.expensive_hours = min(max(expensive_hours, 1), 24)
+        self._set_ranking_options(
+            custom_peak,
+            cheap_hours,
+            expensive_hours,
+            cheap_am_hours,
+            expensive_am_hours,
+            cheap_pm_hours,
+            expensive_pm_hours,
+        )
         
+        # Konfiguracja taryfy i sensory krzywych cen końcowych
+        self._tariff_config = tariff_config
+        self._curve_sensors = []
+        self._cost_sensor = None
+
+        # Historia cen i opcjonalna prognoza na kolejne dni
+        self._history = history
+        self._forecast_days = 0
+        self._forecast_method = forecast_method
+        self._forecaster = None
+        self._forecast = []
+        self._configure_forecast(forecast_days, forecast_method)
+
+        # Opcjonalny cache współdzielony przez instancje HA na tym samym hoście
+        self._shared_cache = shared_cache
+
+        # Ranking kroczący N kolejnych godzin przez granicę doby
+        self._rolling = None
+        self._rolling_prices = {}
+        self._rolling_slots = []
+        self._configure_rolling(rolling_hours)
+
+        # Czas ostatniego uzupełniania brakujących kwadransów
+        self._last_partial_refetch = None
+
+        # Sposób agregacji kwadransów do godzin
+        self._aggregation = aggregation
+        self._quarter_weights = quarter_weights
+
         # Aktualna wartość sensora
         self._attr_native_value = None
         self._attr_native_unit_of_measurement = f"{DEFAULT_CURRENCY}/{DEFAULT_PRICE_TYPE}"
 
+    # -------------------------------------------------------------
+    # KONFIGURACJA Z OPCJI
+    # -------------------------------------------------------------
+
+    def _set_ranking_options(
+        self,
+        custom_peak: str,
+        cheap_hours: int,
+        expensive_hours: int,
+        cheap_am_hours: int,
+        expensive_am_hours: int,
+        cheap_pm_hours: int,
+        expensive_pm_hours: int,
+    ) -> None:
+        """Ustaw parametry rankingu i zakresu szczytu (z walidacją)."""
+        self._ranking = PriceRanking(
+            custom_peak,
+            cheap_hours,
+            expensive_hours,
+            cheap_am_hours,
+            expensive_am_hours,
+            cheap_pm_hours,
+            expensive_pm_hours,
+        )
+
+    @property
+    def aggregation(self) -> str:
+        """Bieżący sposób agregacji kwadransów do godzin."""
+        return self._aggregation
+
+    @property
+    def quarter_weights(self) -> tuple:
+        """Bieżące wagi kwadransów (agregacja weighted)."""
+        return self._quarter_weights
+
+    @property
+    def ranking(self) -> PriceRanking:
+        """Bieżące parametry rankingu."""
+        return self._ranking
+
+    def _configure_forecast(self, forecast_days: int, forecast_method: str) -> bool:
+        """
+        Ustaw prognozę; zwraca True jeśli utworzono nowy model do nauczenia.
+        """
+        forecast_days = min(max(forecast_days, 0), 3)
+        if self._history is None or not forecast_days:
+            self._forecast_days = 0
+            self._forecaster = None
+            self._forecast = []
+            return False
+
+        self._forecast_days = forecast_days
+        if self._forecaster is not None and self._forecast_method == forecast_method:
+            return False
+
+        self._forecast_method = forecast_method
+        self._forecaster = PriceForecaster(forecast_method)
+        return True
+
+    def _configure_rolling(self, rolling_hours: int) -> None:
+        """Ustaw długość okna rankingu kroczącego (0 = wyłączony)."""
+        rolling_hours = min(max(rolling_hours, 0), MAX_ROLLING_HOURS)
+        if not rolling_hours:
+            self._rolling = None
+            self._rolling_slots = []
+        elif self._rolling is None or self._rolling.size != rolling_hours:
+            self._rolling = RollingRanking(rolling_hours)
+
+    async def async_apply_options(self, options) -> None:
+        """
+        Zastosuj zmienione opcje bez przeładowania integracji.
+
+        Ranking i statystyki są liczone ponownie na danych w pamięci
+        (w executorze), bez zapytań do API; stan jest zapisywany raz.
+        """
+        ranking_options = _ranking_options(options)
+        for sensor in (self, *self._curve_sensors):
+            sensor._set_ranking_options(*ranking_options)
+
+        self._tariff_config = tariff_config_from_options(options)
+        shared_cache_dir = options.get(CONF_SHARED_CACHE_DIR, DEFAULT_SHARED_CACHE_DIR)
+        self._shared_cache = SharedDayCache(shared_cache_dir) if shared_cache_dir else None
+        self._configure_rolling(options.get(CONF_ROLLING_HOURS, DEFAULT_ROLLING_HOURS))
+
+        if self._configure_forecast(
+            options.get(CONF_FORECAST_DAYS, DEFAULT_FORECAST_DAYS),
+            options.get(CONF_FORECAST_METHOD, DEFAULT_FORECAST_METHOD),
+        ):
+            await self.hass.async_add_executor_job(
+                self._forecaster.learn_days, self._history.items()
+            )
+
+        previous_aggregation = self._aggregation
+        previous_weights = self._quarter_weights
+        self._aggregation = options.get(CONF_AGGREGATION, DEFAULT_AGGREGATION)
+        self._quarter_weights = quarter_weights_from_option(
+            options.get(CONF_QUARTER_WEIGHTS, DEFAULT_QUARTER_WEIGHTS)
+        )
+
+        if (previous_aggregation, previous_weights) != (self._aggregation, self._quarter_weights):
+            # Zmiana agregacji - przelicz godziny z kwadransów w pamięci
+            if self._today:
+                self._today = await self.hass.async_add_executor_job(
+                    self._reaggregate, self._today, self._today_date, previous_aggregation
+                )
+            if self._tomorrow:
+                self._tomorrow = await self.hass.async_add_executor_job(
+                    self._reaggregate, self._tomorrow, self._tomorrow_date, previous_aggregation
+                )
+        else:
+            if self._today:
+                self._today = await self.hass.async_add_executor_job(self._rerank, self._today)
+            if self._tomorrow:
+                self._tomorrow = await self.hass.async_add_executor_job(self._rerank, self._tomorrow)
+
+        await self._async_data_changed()
+        self.async_write_ha_state()
+
     # -------------------------------------------------------------
     # METODY DO POBRANIA DANYCH Z API
     # -------------------------------------------------------------
 
-    async def sday(self, dday: int):
+    def _fetch_day(self, day_str: str):
         """
-        Pobierz dane dla konkretnego dnia z API PSE.
+        Pobierz surową odpowiedź API PSE dla dnia (wywoływane w executorze).
+
+        Jeśli skonfigurowano współdzielony cache, zapytanie do API wykonuje
+        tylko pierwsza instancja na hoście.
         """
-        now = datetime.now() + timedelta(days=dday)
-        day_str = now.strftime("%Y-%m-%d")
-        
+        if self._shared_cache is not None:
+            return self._shared_cache.fetch(day_str, self._fetch_day_from_api)
+        return self._fetch_day_from_api(day_str)
+
+    def _fetch_day_from_api(self, day_str: str):
+        """Wykonaj zapytanie HTTP do API PSE dla dnia."""
+        return self._fetch_url(URL.format(day=day_str), day_str)
+
+    def _fetch_url(self, url: str, day_str: str):
+        """Wykonaj zapytanie HTTP do API PSE i zwróć surową odpowiedź."""
         try:
-            # Wykonaj zapytanie HTTP
-            response = await self.hass.async_add_executor_job(
-                lambda: requests.get(URL.format(day=day_str), timeout=10)
-            )
+            response = requests.get(url, timeout=10)
             response.raise_for_status()
-            
-            json_data = response.json()
-            if not json_data.get("value"):
-                _LOGGER.warning("Brak danych cenowych dla %s", day_str)
-                return None
-                
-            _LOGGER.debug("Pobrano dane dla %s", day_str)
-            return json_data
-            
+            return response.content
+
         except requests.exceptions.Timeout:
             _LOGGER.error("Timeout przy pobieraniu danych PSE dla %s", day_str)
         except requests.exceptions.RequestException as e:
             _LOGGER.error("Błąd przy pobieraniu danych PSE dla %s: %s", day_str, e)
-        except json.JSONDecodeError:
-            _LOGGER.error("Nieprawidłowa odpowiedź JSON z API PSE dla %s", day_str)
-        
+
         return None
 
-    async def json_to_day_raw(self, dday: int):
+    def _load_day(self, day_str: str):
         """
-        Konwertuj odpowiedź JSON z API na ustrukturyzowane dane dzienne.
-        
-        Uwaga: 
-        1. Średnia dla godziny X jest liczona z kwadransów: X:15, X:30, X:45, X+1:00
-        2. Godziny są numerowane 1-24
+        Pobierz, zdekoduj, zagreguj i oceń dzień (jedno zadanie executora).
+
+        Do pętli zdarzeń wraca tylko gotowa, niemodyfikowana dalej krotka godzin.
         """
-        json_data = await self.sday(dday)
-        if not json_data:
-            return []
+        values = self._decode(self._fetch_day(day_str), day_str)
+        if not values:
+            return ()
 
-        # Struktura do przechowywania kwadransów
-        quarters_by_hour = defaultdict(list)
+        _LOGGER.debug("Pobrano dane dla %s", day_str)
+        return self._day_from_values(values, date.fromisoformat(day_str))
 
-        # Przetwórz każdy 15-minutowy punkt danych
-        for item in json_data.get("value", []):
-            try:
-                dt = datetime.fromisoformat(item["dtime"].replace('Z', '+00:00'))
-                price = float(item["rce_pln"])
-                
-                # Określ do której godziny (1-24) należy ten kwadrans
-                hour_0_23 = dt.hour
-                minute = dt.minute
-                
-                if minute == 0:
-                    target_hour_0_23 = (hour_0_23 - 1) % 24
-                elif minute == 15:
-                    target_hour_0_23 = hour_0_23
-                elif minute == 30:
-                    target_hour_0_23 = hour_0_23
-                elif minute == 45:
-                    target_hour_0_23 = hour_0_23
-                else:
-                    continue
-                
-                # Konwertuj z 0-23 na 1-24
-                target_hour_1_24 = target_hour_0_23 + 1
-                if target_hour_1_24 == 25:
-                    target_hour_1_24 = 1
-                    
-                quarters_by_hour[target_hour_1_24].append(price)
-                
-            except (KeyError, ValueError, TypeError, AttributeError) as e:
-                _LOGGER.warning("Nieprawidłowy element danych: %s, błąd: %s", item, e)
-                continue
+    def _day_from_values(self, values, day_date: date):
+        """Zagreguj punkty API jednego dnia do godzin i oceń dzień."""
+        day = day_from_values(values, day_date, self._aggregation, self._quarter_weights)
+        self._calculate_price_ranking(day)
+        return tuple(day)
 
-        # Zbuduj kompletny dzień z 24 godzinami (1-24)
-        day = []
-        for hour in range(1, 25):
-            if hour in quarters_by_hour and len(quarters_by_hour[hour]) >= 3:
-                avg_price = round(mean(quarters_by_hour[hour]), 2)
-                day.append({
-                    "hour": hour,
-                    "start": f"{hour-1:02d}:00",
-                    "tariff": avg_price,
-                    "quarters_count": len(quarters_by_hour[hour]),
-                })
-            elif hour in quarters_by_hour:
-                avg_price = round(mean(quarters_by_hour[hour]), 2)
-                day.append({
-                    "hour": hour,
-                    "start": f"{hour-1:02d}:00",
-                    "tariff": avg_price,
-                    "quarters_count": len(quarters_by_hour[hour]),
-                })
+    @staticmethod
+    def _decode(content, day_str: str):
+        """Zdekoduj odpowiedź API i zwróć listę punktów danych (lub None)."""
+        if content is None:
+            return None
+
+        try:
+            json_data = orjson.loads(content)
+        except orjson.JSONDecodeError:
+            _LOGGER.error("Nieprawidłowa odpowiedź JSON z API PSE dla %s", day_str)
+            return None
+
+        if not json_data.get("value"):
+            _LOGGER.warning("Brak danych cenowych dla %s", day_str)
+            return None
+
+        return json_data["value"]
+
+    def _load_missing(self, day_date: date, day):
+        """
+        Uzupełnij niekompletne godziny dnia zapytaniami tylko o brakujące
+        zakresy dtime (jedno zadanie executora).
+
+        Sąsiednie brakujące godziny są łączone w jeden zakres, więc luki
+        o 02:00 i 20:00 to dwa małe zapytania zamiast całej doby pomiędzy.
+        Zwraca nową, ocenioną krotkę godzin lub None, jeśli nic nie przybyło.
+        """
+        _, missing = _day_quality(day)
+        if not missing:
+            return None
+
+        offset = alignment_offset(self._aggregation)
+        # Przy offset=0 kwadrans 00:00-00:15 jest publikowany z poprzednią
+        # business_date - zapytanie o ten dzień go nie uzupełni
+        if (
+            offset == 0
+            and missing[0] == 1
+            and day[0]["quarters_count"] == QUARTERS_PER_HOUR - 1
+            and day[0]["quarters"][0] is None
+        ):
+            missing = missing[1:]
+            if not missing:
+                return None
+
+        groups = []
+        for hour in missing:
+            if groups and hour == groups[-1][1] + 1:
+                groups[-1][1] = hour
             else:
-                day.append({
-                    "hour": hour,
-                    "start": f"{hour-1:02d}:00",
-                    "tariff": None,
-                    "quarters_count": 0,
-                })
+                groups.append([hour, hour])
+
+        day_str = day_date.isoformat()
+        slots = flatten_day(day)
+        changed = False
+        for first, last in groups:
+            start = _quarter_dtime(day_date, first, offset)
+            end = _quarter_dtime(day_date, last, QUARTERS_PER_HOUR - 1 + offset)
+            _LOGGER.debug("Uzupełniam dane dla %s w zakresie %s - %s", day_str, start, end)
+
+            values = self._decode(
+                self._fetch_url(URL_RANGE.format(day=day_str, start=start, end=end), day_str),
+                day_str,
+            )
+            if not values:
+                continue
+
+            for index, price in enumerate(bucket_quarters(values, offset, day_date)):
+                if price is not None and slots[index] is None:
+                    slots[index] = price
+                    changed = True
+
+        if not changed:
+            return None
+
+        new_day = build_day(
+            slots, expected_hours(day_date), self._aggregation, self._quarter_weights
+        )
+        self._calculate_price_ranking(new_day)
+        return tuple(new_day)
 
-        hours_with_data = [h for h in range(1, 25) if h in quarters_by_hour]
-        _LOGGER.debug("Godziny z danymi: %s, liczba punktów: %s", 
-                     hours_with_data, 
-                     {h: len(quarters_by_hour[h]) for h in hours_with_data})
+    def _reaggregate(self, day, day_date: date, previous_aggregation: str):
+        """
+        Przelicz godziny dnia z zapisanych kwadransów po zmianie sposobu
+        agregacji (wywoływane w executorze, bez zapytań do API).
+        """
+        slots = realign(
+            flatten_day(day),
+            alignment_offset(previous_aggregation),
+            alignment_offset(self._aggregation),
+        )
+        new_day = build_day(
+            slots, expected_hours(day_date), self._aggregation, self._quarter_weights
+        )
+        self._calculate_price_ranking(new_day)
+        return tuple(new_day)
 
-        return day
+    async def json_to_day_raw(self, dday: int):
+        """
+        Pobierz i przetwórz dane dzienne z API w executorze.
+
+        Uwaga: 
+        1. Godzina jest agregowana z kwadransów zgodnie z opcją aggregation:
+           domyślnie dtime to koniec interwału (godzina 1 = 00:15 ... 01:00),
+           przy interval_start początek (godzina 1 = 00:00 ... 00:45, przy czym
+           kwadrans 00:00 należy do poprzedniej business_date, więc godzina 1
+           ma 3 kwadranse i jest oznaczona jako niekompletna)
+        2. Godziny są numerowane 1-24
+        """
+        day_str = (datetime.now() + timedelta(days=dday)).strftime("%Y-%m-%d")
+        return await self.hass.async_add_executor_job(self._load_day, day_str)
 
     def _calculate_price_ranking(self, day):
         """
-        Oblicz ranking cenowy dla godzin dnia.
-        
+        Oblicz ranking cenowy dla godzin dnia (PriceRanking.rank).
+
         Ranking: 1 = najtańsza godzina, 24 = najdroższa godzina.
-        Dodaje flagi h_price (drogie godziny) i l_price (tanie godziny).
         """
-        if not day:
-            return
-        
-        # Filtruj godziny z prawidłowymi danymi
-        valid_hours = [(i, item) for i, item in enumerate(day) if item["tariff"] is not None]
-        
-        if not valid_hours:
-            return
-        
-        # Sortuj po cenie (rosnąco)
-        sorted_hours = sorted(valid_hours, key=lambda x: x[1]["tariff"])
-        
-        # Przypisz rankingi (1-24 zamiast 0-23)
-        rank = 1
-        prev_price = None
-        same_price_count = 0
-        
-        for position, (index, hour_data) in enumerate(sorted_hours):
-            current_price = hour_data["tariff"]
-            
-            if prev_price is None or current_price != prev_price:
-                rank = position + 1
-                prev_price = current_price
-                same_price_count = 1
-            else:
-                same_price_count += 1
-            
-            day[index]["price_rank"] = rank
-            day[index]["price_position"] = position + 1
-        
-        # Dodaj ranking procentowy
-        for index, hour_data in enumerate(day):
-            if hour_data["tariff"] is not None and "price_position" in hour_data:
-                position = hour_data["price_position"]
-                percentile = round((position - 1) / 23 * 100, 1) if len(valid_hours) > 1 else 50
-                day[index]["price_percentile"] = percentile
-        
-        # PODZIEL NA AM (godziny 1-12) i PM (godziny 13-24)
-        am_hours = [(i, item) for i, item in enumerate(day[:12]) if item["tariff"] is not None]
-        pm_hours = [(i, item) for i, item in enumerate(day[12:], start=12) if item["tariff"] is not None]
-        
-        # RANKING AM (godziny 1-12)
-        if am_hours:
-            sorted_am = sorted(am_hours, key=lambda x: x[1]["tariff"])
-            
-            am_rank = 1
-            prev_price = None
-            for position, (index, hour_data) in enumerate(sorted_am):
-                current_price = hour_data["tariff"]
-                if prev_price is None or current_price != prev_price:
-                    am_rank = position + 1
-                    prev_price = current_price
-                day[index]["am_rank"] = am_rank
-                
-        # RANKING PM (godziny 13-24)
-        if pm_hours:
-            sorted_pm = sorted(pm_hours, key=lambda x: x[1]["tariff"])
-            
-            pm_rank = 1
-            prev_price = None
-            for position, (index, hour_data) in enumerate(sorted_pm):
-                current_price = hour_data["tariff"]
-                if prev_price is None or current_price != prev_price:
-                    pm_rank = position + 1
-                    prev_price = current_price
-                day[index]["pm_rank"] = pm_rank
-        
-        # Dodaj flagi AM (tylko dla godzin 1-12)
-        total_am_hours = len(am_hours)
-        for index, hour_data in enumerate(day[:12]):
-            if hour_data["tariff"] is not None:
-                am_rank_value = hour_data.get("am_rank")
-                
-                if am_rank_value and am_rank_value <= self.cheap_am_hours:
-                    day[index]["am_l_price"] = True
-                else:
-                    day[index]["am_l_price"] = False
-                
-                if am_rank_value and am_rank_value > total_am_hours - self.expensive_am_hours:
-                    day[index]["am_h_price"] = True
-                else:
-                    day[index]["am_h_price"] = False
-            else:
-                day[index]["am_l_price"] = False
-                day[index]["am_h_price"] = False
-        
-        # Dodaj flagi PM (tylko dla godzin 13-24)
-        total_pm_hours = len(pm_hours)
-        for index, hour_data in enumerate(day[12:], start=12):
-            if hour_data["tariff"] is not None:
-                pm_rank_value = hour_data.get("pm_rank")
-                
-                if pm_rank_value and pm_rank_value <= self.cheap_pm_hours:
-                    day[index]["pm_l_price"] = True
-                else:
-                    day[index]["pm_l_price"] = False
-                
-                if pm_rank_value and pm_rank_value > total_pm_hours - self.expensive_pm_hours:
-                    day[index]["pm_h_price"] = True
-                else:
-                    day[index]["pm_h_price"] = False
-            else:
-                day[index]["pm_l_price"] = False
-                day[index]["pm_h_price"] = False
-            
-            # Dodaj flagi h_price i l_price
-            total_valid_hours = len(valid_hours)
-            
-            for index, hour_data in enumerate(day):
-                if hour_data["tariff"] is not None:
-                    rank_value = hour_data.get("price_rank")
-                    
-                    # l_price = true dla najtańszych godzin (cheap_hours)
-                    if rank_value and rank_value <= self.cheap_hours:
-                        day[index]["l_price"] = True
-                    else:
-                        day[index]["l_price"] = False
-                    
-                    # h_price = true dla najdroższych godzin (expensive_hours)
-                    if rank_value and rank_value > total_valid_hours - self.expensive_hours:
-                        day[index]["h_price"] = True
-                    else:
-                        day[index]["h_price"] = False
-                else:
-                    day[index]["l_price"] = False
-                    day[index]["h_price"] = False
+        self._ranking.rank(day)
     
     # -------------------------------------------------------------
     # METODY DO OBLICZEŃ I AKTUALIZACJI
@@ -459,8 +624,8 @@ class RCESensor(SensorEntity):
         pm_night_prices = [item["tariff"] for item in day[20:] if item["tariff"] is not None]
         self._pm_night_avg = round(mean(pm_night_prices), 2) if pm_night_prices else None
         
-        start_index = max(0, min(self.custom_peak_start - 1, 23))
-        end_index = min(24, max(self.custom_peak_end - 1, start_index + 1))
+        start_index = max(0, min(self._ranking.custom_peak_start - 1, 23))
+        end_index = min(24, max(self._ranking.custom_peak_end - 1, start_index + 1))
         
         custom_peak_prices = [
             item["tariff"] for item in day[start_index:end_index] 
@@ -468,6 +633,175 @@ class RCESensor(SensorEntity):
         ]
         self._custom_peak = round(mean(custom_peak_prices), 2) if custom_peak_prices else None
 
+    def _refresh_native_value(self, now):
+        """Ustaw wartość sensora na cenę bieżącej godziny z danych dzisiejszych."""
+        now_hour_0_23 = now.hour
+        now_hour_1_24 = now_hour_0_23 + 1 if now_hour_0_23 < 23 else 24
+
+        for hour_data in self._today:
+            if hour_data["hour"] == now_hour_1_24 and hour_data["tariff"] is not None:
+                self._attr_native_value = hour_data["tariff"]
+                break
+
+    def attach_curve_sensors(self, curve_sensors):
+        """Podłącz sensory krzywych cen końcowych zasilane przez ten sensor."""
+        self._curve_sensors = curve_sensors
+
+    def attach_cost_sensor(self, cost_sensor):
+        """Podłącz licznik kosztów energii zasilany cenami kwadransów."""
+        self._cost_sensor = cost_sensor
+
+    @property
+    def rolling_window(self) -> list[dict]:
+        """Okno rankingu kroczącego od bieżącej godziny (puste, gdy wyłączony)."""
+        return self._rolling_slots
+
+    @property
+    def forecast_prices(self) -> list[dict]:
+        """Prowizoryczna krzywa cen na kolejne dni (pusta, gdy prognoza wyłączona)."""
+        return [
+            {
+                "date": day_date.isoformat(),
+                "hour": item["hour"],
+                "start": item["start"],
+                "price": item["tariff"],
+                "estimated": True,
+            }
+            for day_date, day in self._forecast
+            for item in day
+        ]
+
+    @property
+    def curves_enabled(self) -> bool:
+        """Czy utworzono sensory krzywych cen końcowych (wybrana taryfa)."""
+        return bool(self._curve_sensors)
+
+    @property
+    def energy_meter(self) -> str:
+        """Encja licznika energii, dla której utworzono licznik kosztów."""
+        return self._cost_sensor.meter_entity if self._cost_sensor else DEFAULT_ENERGY_METER
+
+    def _build_curves(self, today_date):
+        """Zbuduj i oceń krzywe cen końcowych (wywoływane w executorze)."""
+        today_curves = build_price_curves(self._today, today_date, self._tariff_config)
+        tomorrow_curves = build_price_curves(
+            self._tomorrow, today_date + timedelta(days=1), self._tariff_config
+        )
+
+        curves = {}
+        for curve_sensor in self._curve_sensors:
+            today = today_curves[curve_sensor.curve]
+            curve_sensor._calculate_price_ranking(today)
+            curves[curve_sensor.curve] = (
+                tuple(today),
+                tuple(tomorrow_curves[curve_sensor.curve]),
+            )
+        return curves
+
+    async def _async_publish_curves(self, now):
+        """
+        Przelicz krzywe cen końcowych raz na zmianę danych i przekaż je sensorom
+        (oraz ceny kwadransów licznikowi kosztów).
+        """
+        if self._cost_sensor is not None:
+            self._cost_sensor.set_prices({
+                day_date: quarter_buy_prices(day, day_date, self._tariff_config)
+                for day_date, day in (
+                    (self._today_date, self._today),
+                    (self._tomorrow_date, self._tomorrow),
+                )
+                if day and day_date is not None
+            })
+
+        # Sensory krzywych istnieją tylko przy wybranej taryfie
+        if not self._curve_sensors or self._tariff_config is None:
+            return
+
+        curves = await self.hass.async_add_executor_job(self._build_curves, now.date())
+        for curve_sensor in self._curve_sensors:
+            today, tomorrow = curves[curve_sensor.curve]
+            curve_sensor.set_days(today, tomorrow, now)
+
+    async def _async_record_and_forecast(self, today_date):
+        """
+        Zapisz nowe dni w historii i przelicz prognozę.
+
+        Uczenie i prognoza działają w executorze, do pętli zdarzeń wraca
+        tylko gotowa lista prognozowanych dni.
+        """
+        if self._history is None:
+            return
+
+        known = {}
+        new_days = []
+        for day_date, day in (
+            (today_date, self._today),
+            (today_date + timedelta(days=1), self._tomorrow),
+        ):
+            if not day:
+                continue
+            known[day_date] = [item["tariff"] for item in day]
+            if self._history.add_day(day_date, day):
+                new_days.append((day_date, known[day_date]))
+
+        if new_days:
+            async_dispatcher_send(
+                self.hass, SIGNAL_DATA_UPDATED, [day_date for day_date, _ in new_days]
+            )
+
+        if self._forecaster is None or not known:
+            return
+
+        if new_days:
+            await self.hass.async_add_executor_job(
+                self._forecaster.learn_days, new_days
+            )
+        self._forecast = await self.hass.async_add_executor_job(
+            self._forecaster.forecast,
+            known,
+            max(known) + timedelta(days=1),
+            self._forecast_days,
+        )
+
+    def _advance_rolling(self, now, reset=False):
+        """
+        Przesuń okno rankingu kroczącego do bieżącej godziny.
+
+        reset=True po zmianie cen (nowe dane z API) - okno jest budowane od nowa,
+        w pozostałych przypadkach aktualizowane przyrostowo.
+        """
+        if self._rolling is None or self._today_date is None:
+            return
+
+        if reset:
+            self._rolling.reset()
+            self._rolling_prices = {}
+            for day_date, day in (
+                (self._today_date, self._today),
+                (self._tomorrow_date, self._tomorrow),
+            ):
+                if day_date is None:
+                    continue
+                for item in day:
+                    self._rolling_prices[(day_date, item["hour"])] = item["tariff"]
+
+        current = (now.date(), now.hour + 1)
+        if not self._rolling.advance(current, self._rolling_prices) and not reset:
+            return
+
+        count = self._rolling.count
+        self._rolling_slots = [
+            {
+                "date": day_date.isoformat(),
+                "hour": hour,
+                "price": price,
+                "rolling_rank": rank,
+                "rolling_l_price": rank is not None and rank <= self._ranking.cheap_hours,
+                "rolling_h_price": rank is not None and rank > count - self._ranking.expensive_hours,
+            }
+            for (day_date, hour), price, rank in self._rolling.slots()
+        ]
+
     # -------------------------------------------------------------
     # METODY AKTUALIZACJI DANYCH
     # -------------------------------------------------------------
@@ -479,18 +813,20 @@ class RCESensor(SensorEntity):
             
             # Pobierz dane na dzisiaj (zawsze)
             self._today = await self.json_to_day_raw(0)
+            self._today_date = now.date()
             
             # Pobierz dane na jutro TYLKO jeśli jest po 14:00
             if now.hour >= 14:
                 self._tomorrow = await self.json_to_day_raw(1)
+                self._tomorrow_date = now.date() + timedelta(days=1)
                 _LOGGER.debug("Pobrano dane na jutro (godzina >= 14:00)")
             else:
                 self._tomorrow = []
+                self._tomorrow_date = None
                 _LOGGER.debug("Nie pobieram danych na jutro (godzina < 14:00)")
 
             if self._today:
                 self._update(self._today)
-                self._calculate_price_ranking(self._today)
 
                 now_hour_0_23 = now.hour
                 now_hour_1_24 = now_hour_0_23 + 1 if now_hour_0_23 < 23 else 24
@@ -507,6 +843,10 @@ class RCESensor(SensorEntity):
                     _LOGGER.warning("Brak danych cenowych dla bieżącej godziny %s", now_hour_1_24)
             else:
                 _LOGGER.warning("Brak danych na dzisiaj")
+
+            await self._async_publish_curves(now)
+            await self._async_record_and_forecast(now.date())
+            self._advance_rolling(now, reset=True)
                 
         except Exception as e:
             _LOGGER.error("Błąd podczas pełnej aktualizacji: %s", e, exc_info=True)
@@ -523,22 +863,129 @@ class RCESensor(SensorEntity):
                 self.last_14_update_day = now.date()
                 return
         
-        if now.date() != self.last_network_pull.date() or not self._today:
+        data_current = now.date() in (self.last_network_pull.date(), self._rollover_day)
+        if (
+            not data_current
+            and self._today
+            and self._tomorrow
+            and self._tomorrow_date == now.date()
+        ):
+            await self._async_rollover(now)
+        elif not data_current or not self._today:
             _LOGGER.debug("Nowy dzień lub brak danych - pobieram dane z API PSE")
             await self.full_update()
             self.last_network_pull = now
         else:
-            now_hour_0_23 = now.hour
-            now_hour_1_24 = now_hour_0_23 + 1 if now_hour_0_23 < 23 else 24
-            
-            for hour_data in self._today:
-                if hour_data["hour"] == now_hour_1_24 and hour_data["tariff"] is not None:
-                    self._attr_native_value = hour_data["tariff"]
-                    break
+            self._refresh_native_value(now)
+            self._advance_rolling(now)
+
+            if (
+                QUALITY_PARTIAL in (_day_quality(self._today)[0], _day_quality(self._tomorrow)[0])
+                and (
+                    self._last_partial_refetch is None
+                    or now - self._last_partial_refetch >= PARTIAL_REFETCH_INTERVAL
+                )
+            ):
+                await self._async_refetch_missing(now)
+
+    def _rerank(self, day):
+        """Zwróć nową, ocenioną kopię dnia (wywoływane w executorze)."""
+        ranked = [dict(item) for item in day]
+        self._calculate_price_ranking(ranked)
+        return tuple(ranked)
+
+    async def _async_rollover(self, now):
+        """
+        Zmiana doby: przenieś zweryfikowane wczoraj dane jutrzejsze na dziś.
+
+        Ranking i statystyki liczone są lokalnie, a dane z API są sprawdzane
+        ponownie w tle - awaria sieci o północy nie wyłącza sensora.
+        """
+        _LOGGER.info("Nowa doba - używam danych pobranych wczoraj jako dzisiejszych")
+        self._today = await self.hass.async_add_executor_job(self._rerank, self._tomorrow)
+        self._today_date = self._tomorrow_date
+        self._tomorrow = []
+        self._tomorrow_date = None
+        self._rollover_day = now.date()
+
+        self._update(self._today)
+        self._refresh_native_value(now)
+        await self._async_publish_curves(now)
+        await self._async_record_and_forecast(now.date())
+        self._advance_rolling(now)
+
+        self.hass.async_create_background_task(
+            self._async_verify_today(now.date()), "rce_pse_verify_today"
+        )
+
+    async def _async_verify_today(self, day_date):
+        """Pobierz dzisiejsze dane w tle i podmień je tylko jeśli się różnią."""
+        day = await self.json_to_day_raw(0)
+        if (
+            not day
+            or self._rollover_day != day_date
+            or self.last_network_pull.date() == day_date
+        ):
+            # Brak danych albo w międzyczasie wykonano pełne pobranie
+            _LOGGER.debug("Weryfikacja danych na %s pominięta", day_date)
+            return
+
+        self.last_network_pull = datetime.now(ZoneInfo(self.hass.config.time_zone))
+        if [item["tariff"] for item in day] == [item["tariff"] for item in self._today]:
+            _LOGGER.debug("Dane na %s zgodne z danymi z poprzedniego dnia", day_date)
+            self.async_write_ha_state()
+            return
+
+        _LOGGER.info("Dane na %s różnią się od pobranych wczoraj - aktualizuję", day_date)
+        self._today = day
+        await self._async_data_changed()
+        self.async_write_ha_state()
+
+    async def _async_refetch_missing(self, now):
+        """Uzupełnij brakujące kwadranse dziś i jutro wąskim zapytaniem do API."""
+        self._last_partial_refetch = now
+        changed = False
+
+        if self._today_date is not None and _day_quality(self._today)[0] == QUALITY_PARTIAL:
+            day = await self.hass.async_add_executor_job(
+                self._load_missing, self._today_date, self._today
+            )
+            if day:
+                self._today = day
+                changed = True
+
+        if self._tomorrow_date is not None and _day_quality(self._tomorrow)[0] == QUALITY_PARTIAL:
+            day = await self.hass.async_add_executor_job(
+                self._load_missing, self._tomorrow_date, self._tomorrow
+            )
+            if day:
+                self._tomorrow = day
+                changed = True
+
+        if changed:
+            _LOGGER.info("Uzupełniono brakujące dane cenowe")
+            await self._async_data_changed()
+
+    async def _async_data_changed(self):
+        """Przelicz statystyki, krzywe, historię i ranking kroczący po zmianie cen."""
+        if self._today_date is None:
+            return
+
+        now = datetime.now(ZoneInfo(self.hass.config.time_zone))
+        if self._today:
+            self._update(self._today)
+            self._refresh_native_value(now)
+        await self._async_publish_curves(now)
+        await self._async_record_and_forecast(self._today_date)
+        self._advance_rolling(now, reset=True)
 
     async def async_added_to_hass(self):
         """Wywoływane gdy encja jest dodawana do Home Assistant."""
         await super().async_added_to_hass()
+        if self._forecaster is not None:
+            await self.hass.async_add_executor_job(
+                self._forecaster.learn_days, self._history.items()
+            )
         await self.full_update()
         now = datetime.now(ZoneInfo(self.hass.config.time_zone))
         if now.hour >= 14:
@@ -637,7 +1084,7 @@ class RCESensor(SensorEntity):
             "day_avg": self._day_avg,
             "pm_night_avg": self._pm_night_avg,
             "custom_peak": self._custom_peak,
-            "custom_peak_range": f"{self.custom_peak_start}-{self.custom_peak_end}",
+            "custom_peak_range": self._ranking.peak_range,
             "current_hour": now_hour_1_24,
             "current_hour_rank": current_hour_rank,
             "current_hour_percentile": current_hour_percentile,
@@ -653,6 +1100,24 @@ class RCESensor(SensorEntity):
             "last_updated": self.last_network_pull.isoformat() if self.last_network_pull else None,
         }
 
+        # Kompletność danych
+        data_quality, missing_hours = _day_quality(self._today)
+        attributes["data_quality"] = data_quality
+        attributes["incomplete_hours"] = missing_hours
+        attributes["ranking_incomplete"] = data_quality != QUALITY_COMPLETE
+        if self._tomorrow:
+            attributes["tomorrow_data_quality"] = _day_quality(self._tomorrow)[0]
+
+        if self._rolling is not None:
+            current_rolling = {}
+            if self._rolling_slots and self._rolling_slots[0]["hour"] == now_hour_1_24:
+                current_rolling = self._rolling_slots[0]
+            attributes["rolling_window_hours"] = self._rolling.size
+            attributes["current_rolling_rank"] = current_rolling.get("rolling_rank")
+            attributes["current_rolling_l_price"] = current_rolling.get("rolling_l_price")
+            attributes["current_rolling_h_price"] = current_rolling.get("rolling_h_price")
+            # Całe okno (do 48 pozycji) - przez WebSocket API (rce_pse/rolling)
+
         today_prices = []
         for item in self._today:
             price_info = {
@@ -682,6 +1147,8 @@ class RCESensor(SensorEntity):
                 price_info["am_rank"] = item["am_rank"]
             if "pm_rank" in item:
                 price_info["pm_rank"] = item["pm_rank"]
+            if "complete" in item:
+                price_info["complete"] = item["complete"]
             
             today_prices.append(price_info)
         
@@ -706,4 +1173,310 @@ class RCESensor(SensorEntity):
                 })
             attributes["tomorrow_prices"] = tomorrow_prices
 
-        return attributes
\ No newline at end of file
+        # Sama krzywa prognozy (do 72 pozycji) jest dostępna przez WebSocket API
+        # (rce_pse/forecast) - w atrybutach przekraczałaby limit rekordera
+        if self._forecast:
+            attributes["forecast_days"] = [day_date.isoformat() for day_date, _ in self._forecast]
+
+        return attributes
+
+
+class RCEPriceCurveSensor(RCESensor):
+    """
+    Sensor krzywej ceny końcowej (zakup / sprzedaż netto) w PLN/kWh.
+
+    Nie pobiera danych z API - krzywą liczy główny sensor raz na zmianę
+    danych i przekazuje ją przez set_days(). Ranking i statystyki liczone
+    są tymi samymi metodami co dla ceny RCE.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        curve: str,
+        custom_peak: str,
+        cheap_hours: int,
+        expensive_hours: int,
+        cheap_am_hours: int,
+        expensive_am_hours: int,
+        cheap_pm_hours: int,
+        expensive_pm_hours: int,
+    ) -> None:
+        """Inicjalizacja sensora krzywej."""
+        super().__init__(
+            hass,
+            custom_peak,
+            cheap_hours,
+            expensive_hours,
+            cheap_am_hours,
+            expensive_am_hours,
+            cheap_pm_hours,
+            expensive_pm_hours,
+        )
+        self.curve = curve
+        self.entity_id = f"sensor.rce_{curve}"
+        self._attr_unique_id = f"rce_{curve}"
+        self._attr_name = (
+            "Cena zakupu energii netto"
+            if curve == CURVE_NET_BUY
+            else "Cena sprzedaży energii netto"
+        )
+        self._attr_native_unit_of_measurement = f"{DEFAULT_CURRENCY}/{CURVE_UNIT}"
+        self._added = False
+
+    def set_days(self, today, tomorrow, last_network_pull):
+        """Przyjmij ocenione krzywe na dziś i jutro, przelicz statystyki."""
+        self._today = today
+        self._tomorrow = tomorrow
+        self.last_network_pull = last_network_pull
+
+        if self._today:
+            self._update(self._today)
+            self._refresh_native_value(datetime.now())
+
+        if self._added:
+            self.async_write_ha_state()
+
+    async def async_update(self):
+        """Aktualizuj wartość dla bieżącej godziny (bez pobierania z sieci)."""
+        if self._today:
+            self._refresh_native_value(datetime.now(ZoneInfo(self.hass.config.time_zone)))
+
+    async def async_added_to_hass(self):
+        """Wywoływane gdy encja jest dodawana do Home Assistant."""
+        await SensorEntity.async_added_to_hass(self)
+        self._added = True
+
+    async def async_will_remove_from_hass(self):
+        """Wywoływane przed usunięciem encji z Home Assistant."""
+        self._added = False
+
+    @property
+    def native_unit_of_measurement(self):
+        """Zwróć jednostkę miary."""
+        return f"{DEFAULT_CURRENCY}/{CURVE_UNIT}"
+
+
+class RCECostSensor(SensorEntity, RestoreEntity):
+    """
+    Licznik kosztu energii: zużycie z licznika (kWh) × cena bieżącego kwadransu.
+
+    Koszt jest naliczany przyrostowo przy każdej zmianie stanu licznika.
+    Przyrost energii między dwoma odczytami jest dzielony proporcjonalnie
+    do czasu na kwadranse, przez które przechodzi, a cena kwadransu jest
+    odczytywana z tablicy 96 cen doby (O(1)). Ceny dostarcza główny sensor
+    przez set_prices(). Stan to koszt bieżącej doby, koszt miesiąca jest
+    atrybutem; oba są zerowane o północy.
+    """
+
+    _attr_device_class = SensorDeviceClass.MONETARY
+    _attr_state_class = SensorStateClass.TOTAL
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+    _attr_native_unit_of_measurement = DEFAULT_CURRENCY
+    _attr_unique_id = "rce_energy_cost"
+    _attr_name = "Koszt energii dziś"
+
+    def __init__(self, hass: HomeAssistant, meter_entity: str) -> None:
+        """Inicjalizacja licznika kosztów."""
+        super().__init__()
+        self.hass = hass
+        self.entity_id = "sensor.rce_energy_cost"
+        self.meter_entity = meter_entity
+
+        # Ceny kwadransów: data -> lista 96 cen PLN/kWh (lub None)
+        self._prices = {}
+
+        # Ostatni odczyt licznika (kWh) i jego czas (UTC)
+        self._last_reading = None
+        self._last_time = None
+
+        # Sumy dzienne i miesięczne
+        self._day = None
+        self._daily_cost = 0.0
+        self._daily_energy = 0.0
+        self._unpriced_energy = 0.0
+        self._monthly_cost = 0.0
+        self._monthly_energy = 0.0
+
+    def set_prices(self, prices: dict) -> None:
+        """Przyjmij ceny kwadransów (zachowując poprzednią dobę dla spóźnionych odczytów)."""
+        if not prices:
+            return
+        oldest = min(prices) - timedelta(days=1)
+        merged = {**self._prices, **prices}
+        self._prices = {day_date: p for day_date, p in merged.items() if day_date >= oldest}
+
+    def _price_at(self, moment: datetime):
+        """Cena kwadransu obejmującego dany moment (czas lokalny)."""
+        prices = self._prices.get(moment.date())
+        if prices is None:
+            return None
+        index = moment.hour * QUARTERS_PER_HOUR + moment.minute // 15
+        return prices[index] if index < len(prices) else None
+
+    def _roll_period(self, day_date: date) -> None:
+        """Wyzeruj sumę dzienną (i miesięczną) po zmianie doby."""
+        if self._day == day_date:
+            return
+        if self._day is None or (self._day.year, self._day.month) != (day_date.year, day_date.month):
+            self._monthly_cost = 0.0
+            self._monthly_energy = 0.0
+        self._day = day_date
+        self._daily_cost = 0.0
+        self._daily_energy = 0.0
+        self._unpriced_energy = 0.0
+        self._attr_last_reset = datetime.combine(
+            day_date, time(), ZoneInfo(self.hass.config.time_zone)
+        )
+
+    def _add(self, moment: datetime, energy: float) -> None:
+        """Dolicz energię zużytą w kwadransie obejmującym dany moment."""
+        price = self._price_at(moment)
+        cost = energy * price if price is not None else 0.0
+        day_date = moment.date()
+
+        if self._day is not None and day_date < self._day:
+            # Spóźniony odczyt z poprzedniej doby - tylko suma miesięczna
+            if (day_date.year, day_date.month) == (self._day.year, self._day.month):
+                self._monthly_cost += cost
+                self._monthly_energy += energy
+            return
+
+        self._roll_period(day_date)
+        self._daily_energy += energy
+        self._monthly_energy += energy
+        if price is None:
+            self._unpriced_energy += energy
+        else:
+            self._daily_cost += cost
+            self._monthly_cost += cost
+
+    def _accumulate(self, start: datetime, end: datetime, energy: float) -> None:
+        """Rozłóż energię z przedziału [start, end] proporcjonalnie na kwadranse."""
+        tz = ZoneInfo(self.hass.config.time_zone)
+        duration = (end - start).total_seconds()
+        if duration <= 0:
+            self._add(end.astimezone(tz), energy)
+            return
+
+        # Granice kwadransów w UTC pokrywają się z lokalnymi (pełne godziny przesunięcia)
+        moment = start
+        while moment < end:
+            boundary = moment.replace(
+                minute=moment.minute // 15 * 15, second=0, microsecond=0
+            ) + timedelta(minutes=15)
+            segment_end = min(boundary, end)
+            share = (segment_end - moment).total_seconds() / duration
+            self._add(moment.astimezone(tz), energy * share)
+            moment = segment_end
+
+    @staticmethod
+    def _reading(state):
+        """Odczyt licznika w kWh lub None gdy stan jest nieprawidłowy."""
+        if state is None:
+            return None
+        factor = ENERGY_UNIT_FACTORS.get(
+            state.attributes.get("unit_of_measurement", "kWh"), 1.0
+        )
+        try:
+            return float(state.state) * factor
+        except (ValueError, TypeError):
+            return None
+
+    @callback
+    def _async_meter_changed(self, event: Event) -> None:
+        """Dolicz koszt przyrostu energii od poprzedniego odczytu."""
+        new_state = event.data.get("new_state")
+        reading = self._reading(new_state)
+        if reading is None:
+            return
+
+        moment = new_state.last_updated.astimezone(timezone.utc)
+        if self._last_reading is not None and reading >= self._last_reading:
+            self._accumulate(self._last_time, moment, reading - self._last_reading)
+        elif self._last_reading is not None:
+            _LOGGER.info("Licznik %s zmniejszył wartość - nowy punkt odniesienia", self.meter_entity)
+
+        self._last_reading = reading
+        self._last_time = moment
+        self.async_write_ha_state()
+
+    @callback
+    def _async_midnight(self, now) -> None:
+        """Zeruj sumę dzienną o północy także bez nowych odczytów."""
+        self._roll_period(now.date())
+        self.async_write_ha_state()
+
+    async def async_added_to_hass(self):
+        """Przywróć sumy i zasubskrybuj zmiany licznika energii."""
+        await super().async_added_to_hass()
+        today = datetime.now(ZoneInfo(self.hass.config.time_zone)).date()
+
+        last_state = await self.async_get_last_state()
+        if last_state is not None and last_state.attributes.get("day"):
+            try:
+                restored_day = date.fromisoformat(last_state.attributes["day"])
+                if (restored_day.year, restored_day.month) == (today.year, today.month):
+                    self._day = restored_day
+                    self._monthly_cost = float(last_state.attributes.get("cost_month", 0))
+                    self._monthly_energy = float(last_state.attributes.get("energy_month", 0))
+                    self._daily_cost = float(last_state.state)
+                    self._daily_energy = float(last_state.attributes.get("energy_today", 0))
+                    self._unpriced_energy = float(
+                        last_state.attributes.get("unpriced_energy_today", 0)
+                    )
+                    # _roll_period nie zmienia tej samej doby - początek okresu
+                    # przywracany razem z sumami
+                    self._attr_last_reset = datetime.combine(
+                        restored_day, time(), ZoneInfo(self.hass.config.time_zone)
+                    )
+            except (ValueError, TypeError) as e:
+                _LOGGER.warning("Nie można przywrócić licznika kosztów: %s", e)
+        self._roll_period(today)
+
+        # Punkt odniesienia - bieżący odczyt licznika
+        meter_state = self.hass.states.get(self.meter_entity)
+        self._last_reading = self._reading(meter_state)
+        if self._last_reading is not None:
+            self._last_time = meter_state.last_updated.astimezone(timezone.utc)
+
+        self.async_on_remove(
+            async_track_state_change_event(
+                self.hass, [self.meter_entity], self._async_meter_changed
+            )
+        )
+        self.async_on_remove(
+            async_track_time_change(
+                self.hass, self._async_midnight, hour=0, minute=0, second=0
+            )
+        )
+
+    @property
+    def native_value(self):
+        """Koszt energii w bieżącej dobie."""
+        return round(self._daily_cost, 2)
+
+    @property
+    def device_info(self):
+        """Zwróć informacje o urządzeniu."""
+        return {
+            "entry_type": DeviceEntryType.SERVICE,
+            "identifiers": {(DOMAIN, "rce_device")},
+            "name": "RCE",
+            "manufacturer": "rce_pse-tommyleesue",
+        }
+
+    @property
+    def extra_state_attributes(self):
+        """Zwróć sumy dzienne i miesięczne."""
+        now = datetime.now(ZoneInfo(self.hass.config.time_zone))
+        return {
+            "meter_entity": self.meter_entity,
+            "day": self._day.isoformat() if self._day else None,
+            "energy_today": round(self._daily_energy, 3),
+            "unpriced_energy_today": round(self._unpriced_energy, 3),
+            "cost_month": round(self._monthly_cost, 2),
+            "energy_month": round(self._monthly_energy, 3),
+            "current_price": self._price_at(now),
+        }
\ No newline at end of file
@@ -0,0 +1,305 @@
+"""Usługi rce_pse-tommyleesue."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+import os
+from zoneinfo import ZoneInfo
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.service import async_set_service_schema
+
+from .const import (
+    DOMAIN,
+    SERVICE_DOMAIN,
+    SERVICE_EXPORT_PRICES,
+    EXPORT_DIR,
+    EXPORT_FORMAT_CSV,
+    EXPORT_FORMATS,
+    EXPORT_MAX_DAYS,
+    HISTORY_MAX_DAYS,
+    SERVICE_BACKTEST,
+    BACKTEST_MODE_DAY,
+    BACKTEST_MODES,
+    DEFAULT_BACKTEST_DAYS,
+    CONF_CUSTOM_PEAK_RANGE,
+    CONF_CHEAP_HOURS,
+    CONF_EXPENSIVE_HOURS,
+    CONF_CHEAP_AM_HOURS,
+    CONF_EXPENSIVE_AM_HOURS,
+    CONF_CHEAP_PM_HOURS,
+    CONF_EXPENSIVE_PM_HOURS,
+)
+from .backtest import run_backtest
+from .export import export_prices
+from .ranking import PriceRanking, parse_peak_range
+
+EXPORT_SCHEMA = vol.Schema({
+    vol.Required("start_date"): cv.date,
+    vol.Required("end_date"): cv.date,
+    vol.Optional("format", default=EXPORT_FORMAT_CSV): vol.In(EXPORT_FORMATS),
+    vol.Optional("filename"): cv.string,
+})
+
+# Opisy pól dla UI - domena usług nie jest domeną integracji, więc HA
+# nie wczyta ich z services.yaml
+EXPORT_DESCRIPTION = {
+    "name": "Eksport cen RCE",
+    "description": (
+        "Zapisuje ceny kwadransowe i godzinowe z rankingiem i flagami "
+        f"do pliku w katalogu <config>/{EXPORT_DIR}/."
+    ),
+    "fields": {
+        "start_date": {
+            "name": "Data początkowa",
+            "description": f"Pierwszy eksportowany dzień (zakres najwyżej {EXPORT_MAX_DAYS} dni).",
+            "required": True,
+            "example": "2024-01-01",
+            "selector": {"date": {}},
+        },
+        "end_date": {
+            "name": "Data końcowa",
+            "description": "Ostatni eksportowany dzień (najpóźniej jutro).",
+            "required": True,
+            "example": "2024-12-31",
+            "selector": {"date": {}},
+        },
+        "format": {
+            "name": "Format",
+            "description": "csv lub parquet (parquet wymaga pakietu pyarrow).",
+            "default": EXPORT_FORMAT_CSV,
+            "selector": {"select": {"options": EXPORT_FORMATS}},
+        },
+        "filename": {
+            "name": "Nazwa pliku",
+            "description": "Nazwa pliku bez katalogu (domyślnie rce_prices_<od>_<do>.<format>).",
+            "example": "rce_2024.csv",
+            "selector": {"text": {}},
+        },
+    },
+}
+
+def _peak_range(value):
+    """Walidator zakresu szczytu "od-do" (godziny 1-24)."""
+    value = cv.string(value)
+    try:
+        parse_peak_range(value)
+    except ValueError as e:
+        raise vol.Invalid(str(e)) from e
+    return value
+
+
+_DAY_HOURS = vol.All(vol.Coerce(int), vol.Range(min=1, max=24))
+_HALF_HOURS = vol.All(vol.Coerce(int), vol.Range(min=1, max=12))
+
+BACKTEST_SCHEMA = vol.Schema({
+    vol.Optional("days", default=DEFAULT_BACKTEST_DAYS): vol.All(
+        vol.Coerce(int), vol.Range(min=1, max=HISTORY_MAX_DAYS)
+    ),
+    vol.Optional(CONF_CHEAP_HOURS): _DAY_HOURS,
+    vol.Optional(CONF_EXPENSIVE_HOURS): _DAY_HOURS,
+    vol.Optional(CONF_CHEAP_AM_HOURS): _HALF_HOURS,
+    vol.Optional(CONF_EXPENSIVE_AM_HOURS): _HALF_HOURS,
+    vol.Optional(CONF_CHEAP_PM_HOURS): _HALF_HOURS,
+    vol.Optional(CONF_EXPENSIVE_PM_HOURS): _HALF_HOURS,
+    vol.Optional(CONF_CUSTOM_PEAK_RANGE): _peak_range,
+    vol.Optional("avoid_range"): _peak_range,
+    vol.Optional("mode", default=BACKTEST_MODE_DAY): vol.In(BACKTEST_MODES),
+    vol.Optional("shift_share", default=1.0): vol.All(
+        vol.Coerce(float), vol.Range(min=0, max=1)
+    ),
+    vol.Optional("load_profile"): vol.All(
+        cv.ensure_list, [vol.All(vol.Coerce(float), vol.Range(min=0))], vol.Length(min=24, max=24)
+    ),
+    vol.Optional("include_daily", default=False): cv.boolean,
+})
+
+
+def _hours_field(name: str, description: str, maximum: int) -> dict:
+    """Opis pola z liczbą godzin dla UI."""
+    return {
+        "name": name,
+        "description": f"{description} Domyślnie wartość z opcji integracji.",
+        "selector": {"number": {"min": 1, "max": maximum, "mode": "box"}},
+    }
+
+
+BACKTEST_DESCRIPTION = {
+    "name": "Symulacja strategii",
+    "description": (
+        "Przelicza strategię tanich / drogich godzin na ostatnich dniach "
+        "historii i porównuje koszt z ceną stałą."
+    ),
+    "fields": {
+        "days": {
+            "name": "Liczba dni",
+            "description": "Liczba ostatnich dni historii do symulacji.",
+            "default": DEFAULT_BACKTEST_DAYS,
+            "selector": {"number": {"min": 1, "max": HISTORY_MAX_DAYS, "mode": "box"}},
+        },
+        CONF_CHEAP_HOURS: _hours_field("Tanie godziny", "Liczba tanich godzin doby.", 24),
+        CONF_EXPENSIVE_HOURS: _hours_field("Drogie godziny", "Liczba drogich godzin doby.", 24),
+        CONF_CHEAP_AM_HOURS: _hours_field("Tanie godziny AM", "Liczba tanich godzin 1-12.", 12),
+        CONF_EXPENSIVE_AM_HOURS: _hours_field("Drogie godziny AM", "Liczba drogich godzin 1-12.", 12),
+        CONF_CHEAP_PM_HOURS: _hours_field("Tanie godziny PM", "Liczba tanich godzin 13-24.", 12),
+        CONF_EXPENSIVE_PM_HOURS: _hours_field("Drogie godziny PM", "Liczba drogich godzin 13-24.", 12),
+        CONF_CUSTOM_PEAK_RANGE: {
+            "name": "Zakres szczytu",
+            "description": (
+                "Zakres szczytu \"od-do\" dla rankingu (jak w opcjach integracji). "
+                "Domyślnie wartość z opcji integracji."
+            ),
+            "example": "17-21",
+            "selector": {"text": {}},
+        },
+        "avoid_range": {
+            "name": "Omijany zakres",
+            "description": (
+                "Zakres godzin \"od-do\" traktowany przez strategię jak drogie "
+                "godziny (domyślnie brak)."
+            ),
+            "example": "17-21",
+            "selector": {"text": {}},
+        },
+        "mode": {
+            "name": "Tryb",
+            "description": "day - flagi l_price / h_price, halves - flagi am_* / pm_*.",
+            "default": BACKTEST_MODE_DAY,
+            "selector": {"select": {"options": BACKTEST_MODES}},
+        },
+        "shift_share": {
+            "name": "Udział przesuwanego zużycia",
+            "description": "Część zużycia z drogich godzin przenoszona na tanie (0-1).",
+            "default": 1.0,
+            "selector": {"number": {"min": 0, "max": 1, "step": 0.05}},
+        },
+        "load_profile": {
+            "name": "Profil zużycia",
+            "description": "24 wartości zużycia w kWh dla godzin 1-24 (domyślnie 1 kWh).",
+            "selector": {"object": {}},
+        },
+        "include_daily": {
+            "name": "Wyniki dzienne",
+            "description": "Dołącz koszty dla każdego dnia.",
+            "default": False,
+            "selector": {"boolean": {}},
+        },
+    },
+}
+
+
+def _ready(hass: HomeAssistant):
+    """Zwróć (historia, sensor) lub zgłoś błąd, gdy integracja nie działa."""
+    data = hass.data.get(DOMAIN, {})
+    history = data.get("history")
+    sensor = data.get("sensor")
+    if history is None or sensor is None:
+        raise HomeAssistantError("Integracja rce_pse-tommyleesue nie jest gotowa")
+    return history, sensor
+
+
+@callback
+def async_register_services(hass: HomeAssistant) -> None:
+    """Zarejestruj usługi integracji."""
+
+    async def async_export_prices(call: ServiceCall):
+        """Wyeksportuj ceny kwadransowe i godzinowe z zakresu dat do pliku."""
+        history, sensor = _ready(hass)
+
+        tomorrow = datetime.now(ZoneInfo(hass.config.time_zone)).date() + timedelta(days=1)
+        start = call.data["start_date"]
+        end = min(call.data["end_date"], tomorrow)
+        if end < start:
+            raise HomeAssistantError("Nieprawidłowy zakres dat")
+        if (end - start).days >= EXPORT_MAX_DAYS:
+            raise HomeAssistantError(
+                f"Zakres eksportu przekracza {EXPORT_MAX_DAYS} dni - podziel go na kilka wywołań"
+            )
+
+        export_format = call.data["format"]
+        filename = call.data.get("filename") or f"rce_prices_{start}_{end}.{export_format}"
+        if os.path.basename(filename) != filename or filename.startswith("."):
+            raise HomeAssistantError(f"Nieprawidłowa nazwa pliku: {filename}")
+        path = hass.config.path(EXPORT_DIR, filename)
+
+        dates = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        entries = {
+            day_date: entry
+            for day_date in dates
+            if (entry := history.get_entry(day_date)) is not None
+        }
+
+        result = await hass.async_add_executor_job(
+            export_prices,
+            path,
+            export_format,
+            dates,
+            entries,
+            sensor.ranking,
+            sensor.aggregation,
+            sensor.quarter_weights,
+        )
+        return {"path": path, **result}
+
+    async def async_backtest(call: ServiceCall):
+        """Przelicz strategię tanich / drogich godzin na ostatnich N dniach historii."""
+        history, sensor = _ready(hass)
+
+        # Parametry strategii; pominięte - z bieżących opcji sensora
+        current = sensor.ranking
+        ranking = PriceRanking(
+            call.data.get(CONF_CUSTOM_PEAK_RANGE, current.peak_range),
+            call.data.get(CONF_CHEAP_HOURS, current.cheap_hours),
+            call.data.get(CONF_EXPENSIVE_HOURS, current.expensive_hours),
+            call.data.get(CONF_CHEAP_AM_HOURS, current.cheap_am_hours),
+            call.data.get(CONF_EXPENSIVE_AM_HOURS, current.expensive_am_hours),
+            call.data.get(CONF_CHEAP_PM_HOURS, current.cheap_pm_hours),
+            call.data.get(CONF_EXPENSIVE_PM_HOURS, current.expensive_pm_hours),
+        )
+        # Zakres omijany przez strategię - niezależny od zakresu szczytu rankingu
+        avoid_hours = frozenset()
+        if "avoid_range" in call.data:
+            avoid_start, avoid_end = parse_peak_range(call.data["avoid_range"])
+            avoid_hours = frozenset(range(avoid_start, min(avoid_end, 25)))
+
+        today = datetime.now(ZoneInfo(hass.config.time_zone)).date()
+        dates = [today - timedelta(days=offset) for offset in range(call.data["days"], 0, -1)]
+        entries = [
+            (day_date, entry)
+            for day_date in dates
+            if (entry := history.get_entry(day_date)) is not None
+        ]
+
+        result = await hass.async_add_executor_job(
+            run_backtest,
+            ranking,
+            entries,
+            call.data.get("load_profile") or [1.0] * 24,
+            call.data["mode"],
+            call.data["shift_share"],
+            avoid_hours,
+        )
+        result["days_missing"] = call.data["days"] - result["days"]
+        if not call.data["include_daily"]:
+            result.pop("daily")
+        return result
+
+    hass.services.async_register(
+        SERVICE_DOMAIN,
+        SERVICE_EXPORT_PRICES,
+        async_export_prices,
+        schema=EXPORT_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    async_set_service_schema(hass, SERVICE_DOMAIN, SERVICE_EXPORT_PRICES, EXPORT_DESCRIPTION)
+    hass.services.async_register(
+        SERVICE_DOMAIN,
+        SERVICE_BACKTEST,
+        async_backtest,
+        schema=BACKTEST_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    async_set_service_schema(hass, SERVICE_DOMAIN, SERVICE_BACKTEST, BACKTEST_DESCRIPTION)
@@ -0,0 +1,174 @@
+"""Taryfy dystrybucyjne i krzywe cen końcowych dla rce_pse-tommyleesue."""
+from __future__ import annotations
+
+from datetime import date
+
+from .const import (
+    CONF_TARIFF,
+    CONF_DISTRIBUTION_PEAK,
+    CONF_DISTRIBUTION_OFFPEAK,
+    CONF_TRADE_MARGIN,
+    CONF_EXCISE,
+    CONF_VAT,
+    CONF_NET_BILLING_COEF,
+    CURVE_NET_BUY,
+    CURVE_NET_SELL,
+    DEFAULT_TARIFF,
+    DEFAULT_DISTRIBUTION_PEAK,
+    DEFAULT_DISTRIBUTION_OFFPEAK,
+    DEFAULT_TRADE_MARGIN,
+    DEFAULT_EXCISE,
+    DEFAULT_VAT,
+    DEFAULT_NET_BILLING_COEF,
+    TARIFF_G12,
+    TARIFF_G12W,
+    TARIFF_G12N,
+    TARIFF_G13,
+    TARIFFS,
+    QUARTERS_PER_HOUR,
+)
+
+ZONE_PEAK = "peak"
+ZONE_OFFPEAK = "offpeak"
+
+# Godziny pozaszczytowe (godzina startu 0-23)
+_G12_OFFPEAK = frozenset({22, 23, 0, 1, 2, 3, 4, 5, 13, 14})
+_G12N_OFFPEAK = frozenset({1, 2, 3, 4})
+_G13_MORNING_PEAK = frozenset(range(7, 13))
+_G13_EVENING_PEAK_SUMMER = frozenset(range(19, 22))
+_G13_EVENING_PEAK_WINTER = frozenset(range(16, 21))
+
+
+def tariff_zone(tariff: str, day: date, hour: int) -> str:
+    """
+    Zwróć strefę taryfową dla godziny 1-24 danego dnia.
+
+    Uwaga: G13 ma dwie strefy szczytowe (przedpołudniową i popołudniową),
+    obie rozliczane stawką szczytową.
+    """
+    start = hour - 1
+    weekend = day.weekday() >= 5
+
+    if tariff == TARIFF_G12:
+        return ZONE_OFFPEAK if start in _G12_OFFPEAK else ZONE_PEAK
+    if tariff == TARIFF_G12W:
+        if weekend:
+            return ZONE_OFFPEAK
+        return ZONE_OFFPEAK if start in _G12_OFFPEAK else ZONE_PEAK
+    if tariff == TARIFF_G12N:
+        if day.weekday() == 6:
+            return ZONE_OFFPEAK
+        return ZONE_OFFPEAK if start in _G12N_OFFPEAK else ZONE_PEAK
+    if tariff == TARIFF_G13:
+        if weekend:
+            return ZONE_OFFPEAK
+        summer = 4 <= day.month <= 9
+        evening = _G13_EVENING_PEAK_SUMMER if summer else _G13_EVENING_PEAK_WINTER
+        if start in _G13_MORNING_PEAK or start in evening:
+            return ZONE_PEAK
+        return ZONE_OFFPEAK
+    return ZONE_PEAK
+
+
+def tariff_config_from_options(options) -> dict | None:
+    """
+    Zbuduj konfigurację taryfy z opcji integracji.
+
+    Zwraca None, gdy taryfy nie wybrano - krzywe cen końcowych są wtedy
+    wyłączone, a licznik kosztów używa samej ceny RCE.
+    """
+    tariff = options.get(CONF_TARIFF, DEFAULT_TARIFF)
+    if tariff not in TARIFFS:
+        return None
+    return {
+        CONF_TARIFF: tariff,
+        CONF_DISTRIBUTION_PEAK: float(
+            options.get(CONF_DISTRIBUTION_PEAK, DEFAULT_DISTRIBUTION_PEAK)
+        ),
+        CONF_DISTRIBUTION_OFFPEAK: float(
+            options.get(CONF_DISTRIBUTION_OFFPEAK, DEFAULT_DISTRIBUTION_OFFPEAK)
+        ),
+        CONF_TRADE_MARGIN: float(options.get(CONF_TRADE_MARGIN, DEFAULT_TRADE_MARGIN)),
+        CONF_EXCISE: float(options.get(CONF_EXCISE, DEFAULT_EXCISE)),
+        CONF_VAT: float(options.get(CONF_VAT, DEFAULT_VAT)),
+        CONF_NET_BILLING_COEF: float(
+            options.get(CONF_NET_BILLING_COEF, DEFAULT_NET_BILLING_COEF)
+        ),
+    }
+
+
+def build_price_curves(day, day_date: date, config: dict) -> dict:
+    """
+    Przelicz dzień cen RCE (PLN/MWh) na krzywe cen końcowych w PLN/kWh.
+
+    - net_buy: (RCE + marża + akcyza + dystrybucja strefy) * (1 + VAT)
+    - net_sell: wartość depozytu prosumenckiego (net-billing) = RCE * współczynnik,
+      ujemne ceny RCE nie zmniejszają depozytu (0)
+
+    Zwraca słownik krzywa -> lista godzin w tym samym formacie co json_to_day_raw.
+    """
+    curves = {CURVE_NET_BUY: [], CURVE_NET_SELL: []}
+    if not day:
+        return curves
+
+    vat_factor = 1 + config[CONF_VAT] / 100
+    fixed = config[CONF_TRADE_MARGIN] + config[CONF_EXCISE]
+    distribution = {
+        ZONE_PEAK: config[CONF_DISTRIBUTION_PEAK],
+        ZONE_OFFPEAK: config[CONF_DISTRIBUTION_OFFPEAK],
+    }
+    coef = config[CONF_NET_BILLING_COEF]
+    tariff = config[CONF_TARIFF]
+
+    for item in day:
+        buy = None
+        sell = None
+        if item["tariff"] is not None:
+            energy = item["tariff"] / 1000
+            zone = tariff_zone(tariff, day_date, item["hour"])
+            buy = round((energy + fixed + distribution[zone]) * vat_factor, 4)
+            sell = round(max(energy, 0) * coef, 4)
+
+        for curve, price in ((CURVE_NET_BUY, buy), (CURVE_NET_SELL, sell)):
+            curves[curve].append({
+                "hour": item["hour"],
+                "start": item["start"],
+                "tariff": price,
+                "quarters_count": item["quarters_count"],
+                "complete": item.get("complete", True),
+            })
+
+    return curves
+
+
+def quarter_buy_prices(day, day_date: date, config: dict | None) -> list:
+    """
+    Zwróć ceny zakupu (PLN/kWh) dla 96 kwadransów doby - do naliczania kosztów.
+
+    Kwadrans k obejmuje czas od k*15 do (k+1)*15 minut doby. Bez konfiguracji
+    taryfy zwracana jest sama cena RCE w PLN/kWh. Brakujący kwadrans dostaje
+    cenę godziny, a godzina bez ceny - None.
+    """
+    if config:
+        vat_factor = 1 + config[CONF_VAT] / 100
+        fixed = config[CONF_TRADE_MARGIN] + config[CONF_EXCISE]
+        distribution = {
+            ZONE_PEAK: config[CONF_DISTRIBUTION_PEAK],
+            ZONE_OFFPEAK: config[CONF_DISTRIBUTION_OFFPEAK],
+        }
+
+    prices = []
+    for item in day:
+        quarters = (list(item.get("quarters") or ()) + [None] * QUARTERS_PER_HOUR)[:QUARTERS_PER_HOUR]
+        quarters = [item["tariff"] if rce is None else rce for rce in quarters]
+        if config:
+            extra = fixed + distribution[tariff_zone(config[CONF_TARIFF], day_date, item["hour"])]
+        for rce in quarters:
+            if rce is None:
+                prices.append(None)
+            elif config:
+                prices.append(round((rce / 1000 + extra) * vat_factor, 5))
+            else:
+                prices.append(round(rce / 1000, 5))
+
+    return prices
@@ -0,0 +1,217 @@
+"""WebSocket API rce_pse-tommyleesue - kolumnowe serie cen dla dashboardów."""
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+from .const import (
+    DOMAIN,
+    MAX_SERIES_DAYS,
+    RESOLUTION_HOUR,
+    RESOLUTIONS,
+    SIGNAL_DATA_UPDATED,
+)
+from .history import day_from_entry
+
+# Flagi przepisywane z rankingu godzinowego do kolumn serii
+FLAG_COLUMNS = (
+    "l_price",
+    "h_price",
+    "am_l_price",
+    "am_h_price",
+    "pm_l_price",
+    "pm_h_price",
+    "rank_incomplete",
+)
+
+SERIES_SCHEMA = {
+    vol.Optional("start_date"): cv.date,
+    vol.Optional("end_date"): cv.date,
+    vol.Optional("resolution", default=RESOLUTION_HOUR): vol.In(RESOLUTIONS),
+}
+
+
+@callback
+def async_register_websocket_api(hass: HomeAssistant) -> None:
+    """Zarejestruj komendy WebSocket API."""
+    websocket_api.async_register_command(hass, websocket_series)
+    websocket_api.async_register_command(hass, websocket_subscribe_series)
+    websocket_api.async_register_command(hass, websocket_forecast)
+    websocket_api.async_register_command(hass, websocket_rolling)
+
+
+def _date_range(hass: HomeAssistant, msg: dict) -> list[date] | None:
+    """Zwróć listę dat z zapytania (domyślnie dziś) lub None gdy zakres jest błędny."""
+    today = datetime.now(ZoneInfo(hass.config.time_zone)).date()
+    start = msg.get("start_date", today)
+    end = msg.get("end_date", start)
+    if end < start or (end - start).days >= MAX_SERIES_DAYS:
+        return None
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+def build_series(entries, rank_day, resolution: str, tz: ZoneInfo) -> dict:
+    """
+    Zbuduj kolumnowe serie (czas w ms, cena, ranking, flagi) dla listy dni.
+
+    Uruchamiane w executorze; `entries` to lista (data, wpis historii),
+    `rank_day` to metoda rankingu sensora (_calculate_price_ranking).
+    W rozdzielczości kwadransowej ranking i flagi godziny są powtarzane
+    dla każdego jej kwadransu.
+    """
+    columns = {"time": [], "price": [], "rank": []}
+    columns.update({flag: [] for flag in FLAG_COLUMNS})
+
+    for day_date, entry in entries:
+        day = day_from_entry(day_date, entry)
+        rank_day(day)
+
+        midnight = datetime.combine(day_date, time(), tz)
+
+        for item in day:
+            quarters = item["quarters"]
+            start = midnight + timedelta(hours=item["hour"] - 1)
+            if resolution == RESOLUTION_HOUR:
+                slots = [(start, item["tariff"])]
+            else:
+                slots = [
+                    (start + timedelta(minutes=15 * k), price)
+                    for k, price in enumerate(quarters)
+                ]
+
+            for slot_start, price in slots:
+                columns["time"].append(int(slot_start.timestamp() * 1000))
+                columns["price"].append(price)
+                columns["rank"].append(item.get("price_rank"))
+                for flag in FLAG_COLUMNS:
+                    columns[flag].append(item.get(flag))
+
+    return columns
+
+
+async def _async_build_series(hass: HomeAssistant, dates, resolution: str):
+    """Zbierz dni z historii i zbuduj serie w executorze."""
+    data = hass.data.get(DOMAIN, {})
+    history = data.get("history")
+    sensor = data.get("sensor")
+    if history is None or sensor is None:
+        return None
+
+    entries = [
+        (day_date, entry)
+        for day_date in dates
+        if (entry := history.get_entry(day_date)) is not None
+    ]
+    series = await hass.async_add_executor_job(
+        build_series,
+        entries,
+        sensor._calculate_price_ranking,
+        resolution,
+        ZoneInfo(hass.config.time_zone),
+    )
+    series["dates"] = [day_date.isoformat() for day_date, _ in entries]
+    series["resolution"] = resolution
+    return series
+
+
+@websocket_api.websocket_command(
+    {vol.Required("type"): "rce_pse/series", **SERIES_SCHEMA}
+)
+@websocket_api.async_response
+async def websocket_series(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict
+) -> None:
+    """Zwróć serie cen dla zakresu dat."""
+    dates = _date_range(hass, msg)
+    if dates is None:
+        connection.send_error(msg["id"], "invalid_range", "Nieprawidłowy zakres dat")
+        return
+
+    series = await _async_build_series(hass, dates, msg["resolution"])
+    if series is None:
+        connection.send_error(msg["id"], "not_ready", "Integracja nie jest gotowa")
+        return
+
+    connection.send_result(msg["id"], series)
+
+
+@websocket_api.websocket_command(
+    {vol.Required("type"): "rce_pse/series/subscribe", **SERIES_SCHEMA}
+)
+@websocket_api.async_response
+async def websocket_subscribe_series(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict
+) -> None:
+    """
+    Subskrybuj serie cen dla zakresu dat.
+
+    Pierwsze zdarzenie zawiera pełny zakres (delta: false), kolejne tylko
+    dni, które zmieniły się w historii (delta: true).
+    """
+    dates = _date_range(hass, msg)
+    if dates is None:
+        connection.send_error(msg["id"], "invalid_range", "Nieprawidłowy zakres dat")
+        return
+
+    wanted = set(dates)
+    resolution = msg["resolution"]
+
+    async def _async_send_delta(updated_dates) -> None:
+        changed = sorted(d for d in updated_dates if d in wanted)
+        if not changed:
+            return
+        series = await _async_build_series(hass, changed, resolution)
+        if series is not None:
+            connection.send_message(
+                websocket_api.event_message(msg["id"], {"delta": True, **series})
+            )
+
+    @callback
+    def _async_data_updated(updated_dates) -> None:
+        hass.async_create_task(_async_send_delta(updated_dates))
+
+    connection.subscriptions[msg["id"]] = async_dispatcher_connect(
+        hass, SIGNAL_DATA_UPDATED, _async_data_updated
+    )
+    connection.send_result(msg["id"])
+
+    series = await _async_build_series(hass, dates, resolution)
+    if series is not None:
+        connection.send_message(
+            websocket_api.event_message(msg["id"], {"delta": False, **series})
+        )
+
+
+@websocket_api.websocket_command({vol.Required("type"): "rce_pse/forecast"})
+@callback
+def websocket_forecast(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict
+) -> None:
+    """Zwróć prowizoryczną krzywą cen na kolejne dni (prognoza sensora)."""
+    sensor = hass.data.get(DOMAIN, {}).get("sensor")
+    if sensor is None:
+        connection.send_error(msg["id"], "not_ready", "Integracja nie jest gotowa")
+        return
+
+    connection.send_result(msg["id"], {"prices": sensor.forecast_prices})
+
+
+@websocket_api.websocket_command({vol.Required("type"): "rce_pse/rolling"})
+@callback
+def websocket_rolling(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict
+) -> None:
+    """Zwróć okno rankingu kroczącego od bieżącej godziny."""
+    sensor = hass.data.get(DOMAIN, {}).get("sensor")
+    if sensor is None:
+        connection.send_error(msg["id"], "not_ready", "Integracja nie jest gotowa")
+        return
+
+    connection.send_result(msg["id"], {"prices": sensor.rolling_window})